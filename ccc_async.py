@@ -0,0 +1,599 @@
+"""
+    Asyncio version of the port bounce workflow in ccc_example.py for running
+    against many MAC addresses at once.
+
+    Every MAC runs the same GET client -> GET interface -> PUT/poll/PUT chain as
+    port_bounce(), but the chains are interleaved on one event loop so total run
+    time tracks API latency instead of the number of MACs. A semaphore bounds how
+    many chains are in flight at the same time.
+
+    Task polling is the one part that is not async: task waits go through
+    ccc_example.task_waiter, whose background thread polls every pending task
+    of the process (sync or async) with the requests session, and the
+    coroutines await its Futures.
+
+    Requires aiohttp (pip install aiohttp).
+"""
+
+import argparse
+import asyncio
+import time
+import weakref
+
+import aiohttp
+
+import ccc_example
+
+DEFAULT_CONCURRENCY = 50
+POOL_IDLE_TIMEOUT = 15  # seconds an idle pooled connection is kept open for reuse
+
+
+def make_session(concurrency: int = DEFAULT_CONCURRENCY) -> aiohttp.ClientSession:
+    """Build an aiohttp session with the same headers as the sync session.
+    The auth token is added per request from ccc_example.token_manager. The
+    connection pool is sized to the concurrency so every in-flight bounce
+    keeps its own kept-alive connection, closed after POOL_IDLE_TIMEOUT
+    seconds unused. Connects and reads time out after
+    ccc_example.CONNECT_TIMEOUT / READ_TIMEOUT like the sync session
+
+    Args:
+        concurrency (int, optional): Max open connections to the controller.
+        Defaults to DEFAULT_CONCURRENCY.
+
+    Returns:
+        aiohttp.ClientSession: Session ready for the async helpers below
+    """
+    connector = aiohttp.TCPConnector(
+        ssl=False,
+        limit=concurrency,
+        limit_per_host=concurrency,
+        keepalive_timeout=POOL_IDLE_TIMEOUT,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(
+            sock_connect=ccc_example.CONNECT_TIMEOUT, sock_read=ccc_example.READ_TIMEOUT
+        ),
+        headers={
+            "content-type": "application/json",
+            "Accept": "application/json",
+        },
+    )
+
+
+async def _token(stale: str | None = None) -> str:
+    """Current token, refreshing in a worker thread so the event loop is not
+    blocked by the auth round trip
+    """
+    manager = ccc_example.token_manager
+    if stale is None:
+        token = manager.current()
+        if token is not None:
+            return token
+        return await asyncio.to_thread(manager.get)
+    return await asyncio.to_thread(manager.refresh, stale)
+
+
+async def _request(
+    session: aiohttp.ClientSession, method: str, url: str, **kwargs
+) -> bytes:
+    """Send a request and return the raw body. Calls are paced by the same
+    ccc_example.rate_limits buckets as the sync session, a 429 is retried
+    after its Retry-After and a 401 is retried once with a refreshed token
+
+    Raises:
+        aiohttp.ClientResponseError: Non 2xx status, message carries the body
+    """
+    token = await _token()
+    family = ccc_example.endpoint_family(url)
+    path = ccc_example.endpoint_template(url)
+    endpoint = f"{method} {path}"
+    bucket = ccc_example.rate_limits[family]
+    refreshed = False
+    throttled = 0
+    while True:
+        delay = bucket.reserve()
+        if delay:
+            remaining = ccc_example.remaining_time()
+            if remaining is not None and delay >= remaining:
+                deadline = ccc_example.current_deadline.get()
+                raise ccc_example.DeadlineExceeded(deadline.phase, deadline.seconds)
+            await asyncio.sleep(delay)
+            ccc_example.latency.observe("phase", f"rate_limit_wait {family}", delay)
+        headers = {"X-Auth-Token": token}
+        start = time.monotonic()
+        async with session.request(method, url, headers=headers, **kwargs) as r:
+            body = await r.read()
+            elapsed = time.monotonic() - start
+            ccc_example.latency.observe("http", endpoint, elapsed, status=r.status)
+            ccc_example.counters.inc("api_calls", method, path, str(r.status))
+            if r.status == 429:
+                ccc_example.counters.inc("rate_limited", family)
+            ccc_example.notify_response(family, r.status, elapsed)
+            if r.status == 401 and not refreshed:
+                refreshed = True
+                token = await _token(stale=token)
+                continue
+            if r.status == 429 and throttled < ccc_example.RATE_LIMIT_RETRIES:
+                bucket.pause(ccc_example.retry_after_seconds(r.headers, throttled))
+                throttled += 1
+                continue
+            if r.status >= 400:
+                raise aiohttp.ClientResponseError(
+                    r.request_info,
+                    r.history,
+                    status=r.status,
+                    message=body.decode("utf-8", "replace"),
+                    headers=r.headers,
+                )
+            return body
+
+
+async def get_client_details(
+    session: aiohttp.ClientSession, mac_address: str
+) -> tuple[str, str]:
+    """Get client details based on MAC Address, shares ccc_example.client_cache
+
+    Args:
+        session (aiohttp.ClientSession): Session from make_session()
+        mac_address (str): MAC address of device in the form of AA:AA:AA..
+
+    Raises:
+        Exception: Empty response from the server
+        Exception: Unable to obtain parent UUID from response
+
+    Returns:
+        tuple[str, str]: Connected Interface Name, and Parent Device UUID
+    """
+    cached = ccc_example.client_cache.get(mac_address.upper())
+    if cached is not None:
+        return cached
+    query = f"?macAddress={mac_address}"
+    url = f"{ccc_example.CCC_URL}/dna/intent/api/v1/client-detail{query}"
+    body = await _request(session, "GET", url)
+    client_details = ccc_example.parse_client_details(ccc_example.decode_json(body))
+    ccc_example.client_cache.put(mac_address.upper(), client_details)
+    return client_details
+
+
+async def get_device_interfaces(
+    session: aiohttp.ClientSession, parent_device_uuid: str
+) -> dict[str, tuple[str, str]]:
+    """Fetch every interface on a device in one call and index it by name
+
+    Args:
+        session (aiohttp.ClientSession): Session from make_session()
+        parent_device_uuid (str): UUID of parent device
+
+    Raises:
+        Exception: Empty response from the server
+
+    Returns:
+        dict[str, tuple[str, str]]: Interface name -> (Interface UUID, Interface Status)
+    """
+    url = f"{ccc_example.CCC_URL}/dna/intent/api/v1/interface/network-device/{parent_device_uuid}"
+    body = await _request(session, "GET", url)
+    return ccc_example.index_device_interfaces(ccc_example.decode_json(body))
+
+
+_index_fetches: dict[str, asyncio.Future] = {}
+
+
+async def _device_interface_index(
+    session: aiohttp.ClientSession, parent_device_uuid: str
+) -> dict[str, tuple[str, str]]:
+    """Return the cached index for a device, with concurrent callers for the
+    same device sharing one in-flight fetch
+    """
+    index = ccc_example.interface_index.get(parent_device_uuid)
+    if index is not None:
+        return index
+    fetch = _index_fetches.get(parent_device_uuid)
+    if fetch is None:
+        fetch = asyncio.ensure_future(get_device_interfaces(session, parent_device_uuid))
+        _index_fetches[parent_device_uuid] = fetch
+        fetch.add_done_callback(lambda _: _index_fetches.pop(parent_device_uuid, None))
+        index = await asyncio.shield(fetch)
+        ccc_example.interface_index.put(parent_device_uuid, index)
+        return index
+    return await asyncio.shield(fetch)
+
+
+async def get_interface_details(
+    session: aiohttp.ClientSession, parent_device_uuid: str, interface_name: str
+) -> tuple[str, str]:
+    """Get interface details on parent device based on interface name, served
+    from ccc_example.interface_index when possible
+
+    Args:
+        session (aiohttp.ClientSession): Session from make_session()
+        parent_device_uuid (str): UUID of parent device
+        interface_name (str): Interface name e.g "GigabitEthernet1/0/3"
+
+    Raises:
+        Exception: Empty response from the server
+        Exception: Unable to locate interface details
+
+    Returns:
+        tuple[str, str]: Interface UUID, and Interface Status (UP/DOWN)
+    """
+    index = await _device_interface_index(session, parent_device_uuid)
+    interface_details = index.get(interface_name)
+    if interface_details is not None:
+        return interface_details
+    query = f"?name={interface_name}"
+    url = f"{ccc_example.CCC_URL}/dna/intent/api/v1/interface/network-device/{parent_device_uuid}/interface-name{query}"
+    body = await _request(session, "GET", url)
+    return ccc_example.parse_interface_details(ccc_example.decode_json(body))
+
+
+async def _set_admin_status(
+    session: aiohttp.ClientSession, url: str, admin_status: str
+) -> None:
+    """PUT a new admin status and wait for the resulting task to finish
+
+    Raises:
+        Exception: Empty Response from the server
+        Exception: Interface status update failed
+    """
+    with ccc_example.bounce_phase(f"put adminStatus={admin_status}"):
+        body = await _request(session, "PUT", url, json={"adminStatus": admin_status})
+    task_id = ccc_example.decode_json(body)["response"]["taskId"]
+    await _wait_task(task_id, f"adminStatus={admin_status}")
+
+
+async def _wait_task(task_id: str, operation: str) -> None:
+    """Wait for an interface change task. The wait goes through
+    ccc_example.task_waiter so the async engine shares the process-wide
+    polling loop instead of running one per interface
+
+    Raises:
+        Exception: Interface status update failed
+    """
+    with ccc_example.bounce_phase(f"task_wait {operation}", record=False):
+        try:
+            await asyncio.wrap_future(ccc_example.task_waiter.submit(task_id, operation=operation))
+        except asyncio.CancelledError:
+            ccc_example.task_waiter.cancel(task_id)
+            raise
+
+
+async def _restore_admin_up(
+    session: aiohttp.ClientSession,
+    url: str,
+    down_task: str | None = None,
+    after: BaseException | None = None,
+) -> None:
+    """Async ccc_example.restore_admin_up(): the admin-UP ending a bounce, sent
+    outside the bounce deadline once a DOWN has gone out, after giving a still
+    pending DOWN task up to ccc_example.RESTORE_WAIT to land
+
+    Raises:
+        Exception: Empty Response from the server
+        Exception: The UP failed after `after`, the port may be left DOWN
+    """
+    deadline = ccc_example.current_deadline.get()
+    token = ccc_example.current_deadline.set(None)
+    try:
+        if down_task is not None:
+            try:
+                async with asyncio.timeout(ccc_example.RESTORE_WAIT):
+                    await _wait_task(down_task, "adminStatus=DOWN")
+            except Exception:
+                pass  # failed or still pending, the UP is the best left to do
+        with ccc_example.latency.phase("put adminStatus=UP"):
+            body = await _request(session, "PUT", url, json={"adminStatus": "UP"})
+        if not body:
+            raise Exception("Empty Response from the server.")
+    except aiohttp.ClientResponseError as e:
+        if "No change in setting" in e.message:
+            return
+        if after is None:
+            raise
+        raise ccc_example.restore_failure(after, e, deadline) from after
+    except Exception as e:
+        if after is None:
+            raise
+        raise ccc_example.restore_failure(after, e, deadline) from after
+    finally:
+        ccc_example.current_deadline.reset(token)
+
+
+async def interface_shut_no_shut(
+    session: aiohttp.ClientSession,
+    interface_uuid: str,
+    current_interface_status: str,
+    mode: str = "Deploy",
+) -> None:
+    """Perform a shut no shut (restart) of interface based on interface status
+
+    Args:
+        session (aiohttp.ClientSession): Session from make_session()
+        interface_uuid (str): UUID of interface
+        current_interface_status (str): Status of Interface e.g UP/DOWN
+        mode (str, optional): Determines if dry run should be executed or
+        if changes should be deployed to perform a shut no shut. Defaults to "Deploy".
+
+    Raises:
+        Exception: Empty Response from the server
+        Exception: Interface status update failed
+    """
+    query = f"?deploymentMode={mode}"
+    url = f"{ccc_example.CCC_URL}/dna/intent/api/v1/interface/{interface_uuid}{query}"
+    if current_interface_status == "DOWN":
+        try:
+            await _set_admin_status(session, url, "UP")
+        except aiohttp.ClientResponseError as e:
+            # the UP of an earlier bounce on this port landed meanwhile
+            if "No change in setting" not in e.message:
+                raise
+    elif current_interface_status == "UP":
+        down_task = None
+        try:
+            with ccc_example.bounce_phase("put adminStatus=DOWN"):
+                body = await _request(session, "PUT", url, json={"adminStatus": "DOWN"})
+            down_task = ccc_example.decode_json(body)["response"]["taskId"]
+            await _wait_task(down_task, "adminStatus=DOWN")
+        except aiohttp.ClientResponseError:
+            raise  # the controller refused the DOWN, nothing to undo
+        except (Exception, asyncio.CancelledError) as e:
+            # the DOWN went out (or may have), so the UP is sent whatever
+            # happened, including the deadline cancelling this task
+            await _restore_admin_up(session, url, down_task=down_task, after=e)
+            raise
+        await _restore_admin_up(session, url)
+    return
+
+
+# event loop -> parent switch UUID -> semaphore. asyncio primitives belong to
+# one loop, so each asyncio.run() gets its own set
+_switch_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+
+
+def _switch_semaphore(parent_device_uuid: str) -> asyncio.Semaphore:
+    semaphores = _switch_semaphores.setdefault(asyncio.get_running_loop(), {})
+    semaphore = semaphores.get(parent_device_uuid)
+    if semaphore is None:
+        semaphore = semaphores[parent_device_uuid] = asyncio.Semaphore(
+            ccc_example.switch_writes.value
+        )
+    return semaphore
+
+
+async def _within_deadline(awaitable):
+    """Await under what is left of ccc_example.current_deadline, cancelling
+    the awaitable when it runs out
+
+    Raises:
+        DeadlineExceeded: The deadline ran out, `phase` is the step it was in
+    """
+    deadline = ccc_example.current_deadline.get()
+    if deadline is None:
+        return await awaitable
+    try:
+        async with asyncio.timeout(deadline.remaining()):
+            return await awaitable
+    except TimeoutError as e:
+        if deadline.remaining() > 0:
+            raise
+        raise ccc_example.DeadlineExceeded(deadline.phase, deadline.seconds) from e
+
+
+# "<parent device UUID>/<interface name>" -> bounce running on that port
+_inflight_bounces: dict[str, asyncio.Future] = {}
+
+
+async def port_bounce(
+    session: aiohttp.ClientSession, mac_address: str, mode: str = "Deploy"
+) -> None:
+    """Performs a shut no shut operation on a POE device based on MAC address.
+    Concurrent calls for the same port join the bounce already running on it
+
+    Args:
+        session (aiohttp.ClientSession): Session from make_session()
+        mac_address (str): MAC address of the device to port bounce
+        mode (str, optional): Option to dry run vs deploy changes. Defaults to "Deploy".
+
+    Raises:
+        DeadlineExceeded: ccc_example.BOUNCE_DEADLINE ran out, `phase` says during which step
+    """
+    counters = ccc_example.counters
+    counters.inc("bounces_attempted")
+    bounce = ccc_example.current_bounce.set(mac_address)
+    seconds = ccc_example.BOUNCE_DEADLINE
+    deadline = ccc_example.current_deadline.set(ccc_example.Deadline(seconds) if seconds else None)
+    try:
+        with ccc_example.latency.phase("port_bounce", mac=mac_address):
+            await _port_bounce(session, mac_address, mode)
+    except Exception:
+        counters.inc("bounces_failed")
+        raise
+    finally:
+        ccc_example.current_deadline.reset(deadline)
+        ccc_example.current_bounce.reset(bounce)
+    counters.inc("bounces_succeeded")
+
+
+async def _port_bounce(session: aiohttp.ClientSession, mac_address: str, mode: str) -> None:
+    with ccc_example.bounce_phase("client_details"):
+        interface_name, parent_device_uuid = await _within_deadline(
+            get_client_details(session, mac_address=mac_address)
+        )
+    port = f"{parent_device_uuid}/{interface_name}"
+    bounce = _inflight_bounces.get(port)
+    owner = bounce is None
+    if owner:
+        bounce = asyncio.ensure_future(
+            _bounce_port(session, mac_address, parent_device_uuid, interface_name, mode)
+        )
+        _inflight_bounces[port] = bounce
+
+        def finished(task: asyncio.Future) -> None:
+            _inflight_bounces.pop(port, None)
+            if not task.cancelled():
+                # every bounce on the port may already have given up on it
+                # at its own deadline, so don't leave the error unretrieved
+                task.exception()
+
+        bounce.add_done_callback(finished)
+    try:
+        if owner:
+            # no timeout here: the bounce task enforces this deadline itself
+            # and must be left to send its restoring admin-UP
+            await asyncio.shield(bounce)
+        else:
+            with ccc_example.bounce_phase("joined_bounce", record=False):
+                await _within_deadline(asyncio.shield(bounce))
+    except Exception:
+        ccc_example.client_cache.pop(mac_address.upper())
+        raise
+
+
+async def _bounce_port(
+    session: aiohttp.ClientSession,
+    mac_address: str,
+    parent_device_uuid: str,
+    interface_name: str,
+    mode: str,
+) -> None:
+    """Shut no shut one resolved port. Changes to the same parent switch are
+    limited to ccc_example.switch_writes.value at a time. It runs as its own
+    task (shielded from the bounces joining it), so it enforces the starting
+    bounce's deadline itself
+    """
+    try:
+        await _within_deadline(
+            _bounce_port_steps(session, parent_device_uuid, interface_name, mode)
+        )
+    finally:
+        ccc_example.forget_interface(parent_device_uuid, interface_name)
+
+
+async def _bounce_port_steps(
+    session: aiohttp.ClientSession, parent_device_uuid: str, interface_name: str, mode: str
+) -> None:
+    latency = ccc_example.latency
+    start = time.monotonic()
+    with ccc_example.bounce_phase("switch_wait", record=False):
+        async with _switch_semaphore(parent_device_uuid):
+            latency.observe("phase", "switch_wait", time.monotonic() - start)
+            with ccc_example.bounce_phase("interface_details"):
+                interface_uuid, current_interface_status = await get_interface_details(
+                    session,
+                    parent_device_uuid=parent_device_uuid,
+                    interface_name=interface_name,
+                )
+            await interface_shut_no_shut(
+                session,
+                interface_uuid=interface_uuid,
+                current_interface_status=current_interface_status,
+                mode=mode,
+            )
+
+
+async def port_bounce_many(
+    macs: list[str],
+    mode: str = "Deploy",
+    concurrency: int = DEFAULT_CONCURRENCY,
+    adaptive: bool = False,
+) -> dict[str, Exception | None]:
+    """Port bounce a list of MAC addresses with at most `concurrency` in flight.
+    Each MAC's client lookup (at most `concurrency` at once) comes first,
+    then its switch slot and only then a concurrency slot, so bounces queued on a busy switch don't hold slots
+    other switches could use. MACs on a port already being bounced skip the
+    switch slot and join that bounce
+
+    Args:
+        macs (list[str]): MAC addresses to port bounce, in any notation
+        mode (str, optional): Option to dry run vs deploy changes. Defaults to "Deploy".
+        concurrency (int, optional): Max bounces in flight. Defaults to DEFAULT_CONCURRENCY.
+        adaptive (bool, optional): Let a ccc_example.AIMDLimiter find the number
+        in flight, up to concurrency, from controller latency and errors. Defaults to False.
+
+    Returns:
+        dict[str, Exception | None]: Normalized MAC -> None on success, or the
+        exception raised. Invalid values map to an Exception and are not sent
+    """
+    macs, invalid = ccc_example.clean_macs(macs)
+    semaphore = asyncio.Semaphore(concurrency)
+    lookups = asyncio.Semaphore(concurrency)  # apart, so queued lookups don't starve bounces
+    limiter = ccc_example.AIMDLimiter(maximum=concurrency) if adaptive else None
+
+    # port -> set once the port's first bounce holds its switch slot
+    dispatched: dict[str, asyncio.Future] = {}
+    # parent switch UUID -> slots handed out here, apart from the ones
+    # _bounce_port_steps() takes so a bounce never waits for its own
+    switch_slots: dict[str, asyncio.Semaphore] = {}
+
+    def switch_slot(parent_device_uuid: str) -> asyncio.Semaphore:
+        slot = switch_slots.get(parent_device_uuid)
+        if slot is None:
+            slot = switch_slots[parent_device_uuid] = asyncio.Semaphore(ccc_example.switch_writes.value)
+        return slot
+
+    async def bounded(session: aiohttp.ClientSession, mac_address: str) -> None:
+        try:
+            async with lookups:
+                interface_name, parent_device_uuid = await get_client_details(
+                    session, mac_address=mac_address
+                )
+        except Exception:
+            ccc_example.counters.inc("bounces_attempted")
+            ccc_example.counters.inc("bounces_failed")
+            raise
+        port = f"{parent_device_uuid}/{interface_name}"
+        started = dispatched.get(port)
+        if started is not None:
+            await asyncio.shield(started)
+            await run(session, mac_address)
+            return
+        started = dispatched[port] = asyncio.get_running_loop().create_future()
+        try:
+            async with switch_slot(parent_device_uuid):
+                started.set_result(None)
+                await run(session, mac_address)
+        finally:
+            if not started.done():
+                started.set_result(None)
+            del dispatched[port]
+
+    async def run(session: aiohttp.ClientSession, mac_address: str) -> None:
+        async with semaphore:
+            if limiter is None:
+                await port_bounce(session, mac_address=mac_address, mode=mode)
+                return
+            await limiter.acquire_async()
+            try:
+                await port_bounce(session, mac_address=mac_address, mode=mode)
+            finally:
+                limiter.release()
+
+    if limiter is not None:
+        ccc_example.response_listeners.append(limiter.on_response)
+    try:
+        async with make_session(concurrency) as session:
+            outcomes = await asyncio.gather(
+                *(bounded(session, mac) for mac in macs), return_exceptions=True
+            )
+    finally:
+        if limiter is not None:
+            ccc_example.response_listeners.remove(limiter.on_response)
+    return {**dict(zip(macs, outcomes)), **invalid}
+
+
+def main() -> None:
+    """
+    Main entry point of the program. This is just personal convention
+    """
+    parser = argparse.ArgumentParser(description="Port bounce the demo MAC address with the asyncio engine")
+    ccc_example.add_run_options(parser)
+    ccc_example.apply_run_options(parser.parse_args())
+    macs = ["00:A2:89:AA:AA:AA"] # Fake MAC Address for demo
+    with ccc_example.profile_stage("port_bounce_many"):
+        results = asyncio.run(port_bounce_many(macs))
+    for mac_address, error in results.items():
+        print(f"{mac_address}: {'OK' if error is None else error}")
+
+
+if __name__ == "__main__":
+    main()
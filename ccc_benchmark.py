@@ -0,0 +1,342 @@
+"""
+    Benchmarks the port bounce workflow in ccc_example.py against the local
+    mock controller in ccc_mock_server.py.
+
+    Each mode (sequential port_bounce(), threaded port_bounce_batch(), the
+    asyncio port_bounce_many() and the DOWN/UP wave scheduler
+    port_bounce_waves()) is run for every batch size, and the report
+    shows throughput, p50/p95/p99 latency per phase and API calls per bounce.
+    Phases are timed by wrapping the module functions for the length of a run,
+    so the workflow code itself is benchmarked unmodified.
+
+    --decode runs a CPU microbenchmark of response decoding instead: the old
+    r.text + r.json() pattern against ccc_example.decode_json() with each
+    JSON library that is installed, on a large client-detail payload.
+
+    Usage:
+        python ccc_benchmark.py
+        python ccc_benchmark.py --sizes 1,100,1000 --modes threaded,async --json bench.json
+        python ccc_benchmark.py --decode 500
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from contextlib import contextmanager
+
+import requests
+
+import ccc_example
+import ccc_mock_server
+
+MODES = ("sequential", "threaded", "async", "waves")
+DEFAULT_SIZES = (1, 100, 1_000, 10_000)
+SEQUENTIAL_MAX = 100  # sequential runs above this size are skipped, they take minutes
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile, 0.0 for an empty list"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def make_macs(count: int, prefix: str = "02:00") -> list[str]:
+    """Distinct, locally administered MAC addresses"""
+    return [
+        f"{prefix}:{(i >> 24) & 0xFF:02X}:{(i >> 16) & 0xFF:02X}:{(i >> 8) & 0xFF:02X}:{i & 0xFF:02X}"
+        for i in range(count)
+    ]
+
+
+class PhaseTimer:
+    """Collects wall-clock samples per phase name"""
+
+    def __init__(self) -> None:
+        self.samples: dict[str, list[float]] = {}
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.samples.setdefault(phase, []).append(seconds)
+
+    def wrap(self, phase: str, func):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add(phase, time.perf_counter() - start)
+        return timed
+
+    def wrap_async(self, phase: str, func):
+        async def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self.add(phase, time.perf_counter() - start)
+        return timed
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        return {
+            phase: {
+                "count": len(values),
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "p99": percentile(values, 99),
+            }
+            for phase, values in self.samples.items()
+        }
+
+
+@contextmanager
+def patched(module, name: str, replacement):
+    original = getattr(module, name)
+    setattr(module, name, replacement)
+    try:
+        yield
+    finally:
+        setattr(module, name, original)
+
+
+@contextmanager
+def timed_phases(timer: PhaseTimer, mode: str):
+    """Wrap the workflow functions of the module `mode` uses with timers"""
+    waiter = ccc_example.task_waiter
+    original_submit = waiter.submit
+    timed = set()  # futures already timed, wait() submits again for a known task
+
+    def done(future, start: float) -> None:
+        timed.discard(future)
+        if not future.cancelled():
+            timer.add("task_wait", time.perf_counter() - start)
+
+    def submit(task_id, *args, **kwargs):
+        start = time.perf_counter()
+        future = original_submit(task_id, *args, **kwargs)
+        if future not in timed:
+            timed.add(future)
+            future.add_done_callback(lambda f: done(f, start))
+        return future
+
+    with patched(waiter, "submit", submit):
+        if mode == "async":
+            import ccc_async
+            with patched(ccc_async, "get_client_details", timer.wrap_async("client_details", ccc_async.get_client_details)), \
+                 patched(ccc_async, "get_interface_details", timer.wrap_async("interface_details", ccc_async.get_interface_details)), \
+                 patched(ccc_async, "interface_shut_no_shut", timer.wrap_async("shut_no_shut", ccc_async.interface_shut_no_shut)), \
+                 patched(ccc_async, "port_bounce", timer.wrap_async("bounce", ccc_async.port_bounce)):
+                yield
+        else:
+            with patched(ccc_example, "get_client_details", timer.wrap("client_details", ccc_example.get_client_details)), \
+                 patched(ccc_example, "get_interface_details", timer.wrap("interface_details", ccc_example.get_interface_details)), \
+                 patched(ccc_example, "interface_shut_no_shut", timer.wrap("shut_no_shut", ccc_example.interface_shut_no_shut)), \
+                 patched(ccc_example, "port_bounce", timer.wrap("bounce", ccc_example.port_bounce)):
+                yield
+
+
+def run_mode(
+    mode: str, macs: list[str], workers: int, adaptive: bool = False
+) -> dict[str, Exception | None]:
+    """Bounce `macs` with one of the MODES and return per-MAC results"""
+    if mode == "sequential":
+        results = {}
+        for mac_address in macs:
+            try:
+                ccc_example.port_bounce(mac_address=mac_address)
+                results[mac_address] = None
+            except Exception as e:
+                results[mac_address] = e
+        return results
+    if mode == "threaded":
+        return ccc_example.port_bounce_batch(macs, max_workers=workers, adaptive=adaptive)
+    if mode == "waves":
+        return ccc_example.port_bounce_waves(macs, max_workers=workers)
+    if mode == "async":
+        import ccc_async
+        return asyncio.run(ccc_async.port_bounce_many(macs, concurrency=workers, adaptive=adaptive))
+    raise ValueError(f"Unknown mode {mode}")
+
+
+def benchmark(
+    controller: ccc_mock_server.MockController,
+    mode: str,
+    size: int,
+    workers: int,
+    adaptive: bool = False,
+) -> dict:
+    """Run one mode/size combination from a cold cache and report on it"""
+    ccc_example.client_cache.clear()
+    ccc_example.interface_index.clear()
+    macs = make_macs(size)
+    timer = PhaseTimer()
+    with controller.lock:
+        controller.calls.clear()
+    start = time.perf_counter()
+    with timed_phases(timer, mode):
+        results = run_mode(mode, macs, workers, adaptive)
+    elapsed = time.perf_counter() - start
+    with controller.lock:
+        calls = dict(controller.calls)
+    api_calls = sum(count for name, count in calls.items() if name not in ("401", "429", "5xx"))
+    failures = sum(1 for error in results.values() if error is not None)
+    return {
+        "mode": mode,
+        "size": size,
+        "workers": workers,
+        "seconds": elapsed,
+        "bounces_per_second": size / elapsed if elapsed else 0.0,
+        "failures": failures,
+        "api_calls_per_bounce": api_calls / size,
+        "api_calls": calls,
+        "phases": timer.summary(),
+    }
+
+
+def client_detail_payload(nodes: int) -> bytes:
+    """client-detail body shaped like a real one, with a topology of `nodes`
+    nodes and links so the decode cost can be scaled up"""
+    detail = {f"field{i}": f"value {i}" for i in range(80)}
+    detail.update({
+        "hostMac": "00:A2:89:AA:AA:AA",
+        "port": "GigabitEthernet1/0/1",
+        "connectedDevice": [{"id": "00000000-0000-0000-0000-000000000001"}],
+        "healthScore": [{"healthType": t, "score": 10} for t in ("OVERALL", "ONBOARDED", "CONNECTED")],
+    })
+    topology = {
+        "nodes": [
+            {"id": f"node-{i}", "name": f"switch-{i}", "deviceType": "Cisco Catalyst 9300 Switch",
+             "ip": f"10.0.{i // 256}.{i % 256}", "healthScore": i % 10, "level": i % 4,
+             "description": "Ünïcode site näme", "additionalInfo": {"macAddress": "00:00:00:00:00:00"}}
+            for i in range(nodes)
+        ],
+        "links": [
+            {"source": f"node-{i}", "target": f"node-{i + 1}", "linkStatus": "UP",
+             "portUtilization": None, "sourcePortName": "TenGigabitEthernet1/1/1"}
+            for i in range(nodes - 1)
+        ],
+    }
+    return json.dumps({"detail": detail, "topology": topology}).encode()
+
+
+def decode_benchmark(nodes: int, iterations: int = 200) -> dict[str, float]:
+    """Microseconds of CPU per decoded response, per decoding approach"""
+    body = client_detail_payload(nodes)
+
+    def response() -> requests.Response:
+        r = requests.Response()
+        r._content = body
+        r.status_code = 200
+        r.headers["Content-Type"] = "application/json"
+        r.encoding = requests.utils.get_encoding_from_headers(r.headers)
+        return r
+
+    def text_then_json(r):  # what every function did before decode_json()
+        if r.text == "":
+            raise Exception("Empty Response from the server.")
+        return r.json()
+
+    approaches = {"r.text + r.json()": text_then_json}
+    backends = {"json": json.loads}
+    try:
+        import orjson
+        backends["orjson"] = orjson.loads
+    except ImportError:
+        pass
+    try:
+        import msgspec
+        backends["msgspec"] = msgspec.json.decode
+    except ImportError:
+        pass
+    for name, loads in backends.items():
+        def decode(r, loads=loads):
+            with patched(ccc_example, "_json_loads", loads):
+                return ccc_example.decode_json(r.content)
+        approaches[f"decode_json ({name})"] = decode
+
+    results = {"payload_bytes": len(body)}
+    for name, approach in approaches.items():
+        responses = [response() for _ in range(iterations)]
+        start = time.process_time()
+        for r in responses:
+            approach(r)
+        results[name] = (time.process_time() - start) / iterations * 1_000_000
+    return results
+
+
+def print_report(report: dict) -> None:
+    print(
+        f"\n{report['mode']:<10} n={report['size']:<6} workers={report['workers']:<4} "
+        f"{report['seconds']:8.2f}s  {report['bounces_per_second']:8.1f} bounces/s  "
+        f"{report['api_calls_per_bounce']:5.2f} calls/bounce  failures={report['failures']}"
+    )
+    for phase, stats in report["phases"].items():
+        print(
+            f"    {phase:<18} n={stats['count']:<6} p50={stats['p50'] * 1000:8.1f}ms "
+            f"p95={stats['p95'] * 1000:8.1f}ms p99={stats['p99'] * 1000:8.1f}ms"
+        )
+
+
+def main() -> None:
+    """
+    Main entry point of the program. This is just personal convention
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)))
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--workers", type=int, default=50, help="Threads / async concurrency for batch modes")
+    parser.add_argument("--adaptive", action="store_true", help="Use AIMD adaptive concurrency up to --workers")
+    parser.add_argument("--sequential-max", type=int, default=SEQUENTIAL_MAX)
+    parser.add_argument("--switches", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.01, help="Mock seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.005)
+    parser.add_argument("--task-duration", type=float, default=0.2, help="Mock seconds a task stays PENDING")
+    parser.add_argument("--mock-rate-limit", type=float, default=0.0, help="Mock requests/s per endpoint before 429s")
+    parser.add_argument("--rate-limited", action="store_true", help="Keep ccc_example.RATE_LIMITS pacing on")
+    parser.add_argument("--json", dest="json_path", help="Also write the reports to this file")
+    parser.add_argument("--decode", type=int, metavar="NODES", help="Only run the response decoding microbenchmark")
+    args = parser.parse_args()
+
+    if args.decode is not None:
+        results = decode_benchmark(args.decode)
+        print(f"client-detail payload with {args.decode} topology nodes: {results.pop('payload_bytes'):,} bytes")
+        baseline = results["r.text + r.json()"]
+        for name, micros in results.items():
+            print(f"    {name:<24} {micros:10.1f} us/call  {baseline / micros:5.1f}x")
+        return
+
+    controller = ccc_mock_server.MockController(
+        switches=args.switches,
+        latency=args.latency,
+        jitter=args.jitter,
+        task_duration=args.task_duration,
+        rate_limit=args.mock_rate_limit,
+    )
+    if not args.rate_limited:
+        ccc_example.configure_rate_limits({})  # measure the raw request flow
+    server = ccc_mock_server.serve(controller)
+    os.environ["CCC_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ.setdefault("CCC_UN", "benchmark")
+    os.environ.setdefault("CCC_PW", "benchmark")
+
+    reports = []
+    for size in (int(size) for size in args.sizes.split(",")):
+        for mode in args.modes.split(","):
+            if mode == "sequential" and size > args.sequential_max:
+                print(f"\nsequential n={size} skipped (above --sequential-max {args.sequential_max})")
+                continue
+            workers = 1 if mode == "sequential" else args.workers
+            report = benchmark(controller, mode, size, workers, args.adaptive)
+            print_report(report)
+            reports.append(report)
+    server.shutdown()
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
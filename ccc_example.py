@@ -10,23 +10,132 @@
         - use of global space for session definition
         - static array/list position referencing without conditional logic checks
         - accessing dictionary keys without use of ['key'] instead of .get() with defaults
-        - static sleep/time delays instead of exponential backoff logic
 """
 
 import requests
 import os
+import sys
+import json
+import re
+import argparse
+import tempfile
+import contextlib
+from contextlib import contextmanager
 from dotenv import load_dotenv
 import urllib3
-from time import sleep
+import random
+import socket
+import threading
+import atexit
+import contextvars
+import signal
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from collections.abc import Callable, Iterable, Iterator
+from itertools import compress
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from email.utils import parsedate_to_datetime
+from time import monotonic, sleep, time
+
+try:
+    import fcntl  # POSIX only, the token cache skips locking without it
+except ImportError:
+    fcntl = None
+
+# Response bodies are parsed with the fastest JSON library installed
+try:
+    import orjson
+    JSON_BACKEND, _json_loads = "orjson", orjson.loads
+except ImportError:
+    try:
+        import msgspec
+        JSON_BACKEND, _json_loads = "msgspec", msgspec.json.decode
+    except ImportError:
+        JSON_BACKEND, _json_loads = "json", json.loads
 
 urllib3.disable_warnings(
     urllib3.exceptions.InsecureRequestWarning
 )  # Disable SSL certificate warnings
 
-load_dotenv()
-CCC_URL = os.environ["CCC_URL"]
-CCC_UN = os.environ["CCC_UN"]
-CCC_PW = os.environ["CCC_PW"]
+# Connection settings and the shared session are created on first use (see
+# get_session) so importing this module never touches .env or the network.
+CCC_URL: str
+CCC_UN: str
+CCC_PW: str
+DEFAULT_MAX_WORKERS = 10
+TOKEN_LIFETIME = 60 * 60  # Catalyst Center tokens are valid for 60 minutes
+TOKEN_REFRESH_MARGIN = 5 * 60  # refresh this long before the token expires
+CLIENT_CACHE_SIZE = 10_000  # MAC -> (interface, parent device) entries kept
+CLIENT_CACHE_TTL = 5 * 60  # seconds before a cached client location is re-fetched
+INTERFACE_INDEX_SIZE = 2_000  # devices whose full interface list is kept
+INTERFACE_INDEX_TTL = 60  # seconds before a device interface list is re-fetched
+TASK_POLL_FIRST = 0.25  # first lookup delay before any task history is known
+TASK_POLL_MAX = 5  # longest gap between lookups of the same pending task
+TASK_POLL_BACKOFF = 2  # multiplier applied to the gap after each PENDING
+TASK_POLL_JITTER = 0.2  # +/- fraction of randomness so polls do not align
+TASK_POLL_WORKERS = 8  # threads the task waiter uses to fan out one polling round
+POOL_MAXSIZE = DEFAULT_MAX_WORKERS + TASK_POLL_WORKERS  # kept-alive controller connections
+POOL_BLOCK = False  # True makes threads wait for a pooled connection instead of opening throwaway extras
+TCP_KEEPALIVE_IDLE = 60  # seconds idle before TCP keepalive probes, None to leave keepalive off
+# (requests per second, burst) per endpoint family, tune to the controller's
+# published API rate limits. None leaves a family unthrottled (429s still honored)
+RATE_LIMITS = {
+    "client-detail": (5, 10),
+    "interface": (10, 20),
+    "tasks": (20, 40),
+    "other": None,
+}
+RATE_LIMIT_RETRIES = 5  # 429s retried per request before giving up
+SWITCH_WRITE_CONCURRENCY = 1  # interface changes in flight per parent switch
+CONNECT_TIMEOUT = 5  # seconds to open a controller connection before giving up on a call
+READ_TIMEOUT = 30  # seconds to wait for response bytes before giving up on a call
+BOUNCE_DEADLINE = 300  # seconds one port_bounce() may take end to end, None for no limit
+RESTORE_WAIT = 60  # seconds a restoring admin-UP waits for its bounce's pending DOWN task
+STREAM_READ_AHEAD = 1_000  # MACs bounce_stream reads ahead of the finished ones, queued per switch
+LATENCY_BUCKETS = tuple(0.001 * 2 ** (i / 4) for i in range(77))  # 1 ms to ~524 s (8.7 min), each ~19% wider than the last
+AIMD_INITIAL = 4  # bounces in flight an adaptive batch starts with
+AIMD_DECREASE = 0.5  # factor applied to the limit on 429/5xx/latency spike
+AIMD_LATENCY_TOLERANCE = 2.0  # call latency above baseline x this counts as a spike
+AIMD_BASELINE_ALPHA = 0.05  # EWMA weight of a normal call in its family's latency baseline
+AIMD_SPIKE_ALPHA = 0.01  # same for a spike, so a lasting latency shift is learned slowly
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+def _load_config() -> None:
+    """Read CCC_URL/CCC_UN/CCC_PW from the environment (and .env) into module
+    globals, once. Setting CCC_TOKEN_CACHE to a file path turns on the
+    on-disk token cache shared between processes
+    """
+    global CCC_URL, CCC_UN, CCC_PW
+    if "CCC_URL" in globals():
+        return
+    load_dotenv()
+    CCC_UN = os.environ["CCC_UN"]
+    CCC_PW = os.environ["CCC_PW"]
+    cache_path = os.environ.get("CCC_TOKEN_CACHE")
+    if cache_path and token_manager.cache is None:
+        token_manager.cache = FileTokenCache(
+            cache_path, key=f"{CCC_UN}@{os.environ['CCC_URL']}"
+        )
+    CCC_URL = os.environ["CCC_URL"]
+
+def decode_json(body: bytes) -> dict:
+    """Parse a response body straight from its bytes, once, with the
+    JSON_BACKEND library. Shared by the sync and async code paths.
+
+    Args:
+        body (bytes): Raw response body
+
+    Raises:
+        Exception: Empty Response from the server
+
+    Returns:
+        dict: Decoded JSON
+    """
+    if not body:
+        raise Exception("Empty Response from the server.")
+    return _json_loads(body)
 
 def auth_session() -> str:
     """Obtain Token from server for subsequent requests
@@ -37,31 +146,728 @@ def auth_session() -> str:
     Returns:
         str: Token
     """
+    _load_config()
     auth_url = f"{CCC_URL}/dna/system/api/v1/auth/token"
-    r = requests.post(url=auth_url, auth=(CCC_UN, CCC_PW), verify=False)
+    r = requests.post(
+        url=auth_url, auth=(CCC_UN, CCC_PW), verify=False, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)
+    )
+    counters.inc("api_calls", "POST", endpoint_template(auth_url), str(r.status_code))
     r.raise_for_status()
-    if r.text == "":
+    if not r.content:
         raise Exception("Unable to obtain token.")
-    token = r.json()["Token"]
+    token = decode_json(r.content)["Token"]
     return token
 
-# Session Setup
-s = requests.session()
-s.verify = False
-token = auth_session()
-s.headers.update(
-    {
-        "X-Auth-Token": token,
-        "content-type": "application/json",
-        "Accept": "application/json",
+class FileTokenCache:
+    """Token cache in a JSON file so short-lived processes can reuse a token
+    fetched by an earlier or concurrent one instead of authenticating again.
+
+    Entries are keyed by user@controller. Access is serialised across
+    processes with an flock on a sidecar .lock file, and the file is written
+    with 0600 permissions since it holds credentials.
+    """
+
+    def __init__(self, path: str, key: str) -> None:
+        self.path = os.path.expanduser(path)
+        self.key = key
+
+    @contextmanager
+    def locked(self):
+        """Hold the cross-process lock for a read-check-write cycle"""
+        fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)  # closing the descriptor also drops the flock
+
+    def load(self) -> tuple[str, float] | None:
+        """Return (token, issued_at) for this key, or None if absent/unreadable"""
+        try:
+            with open(self.path) as f:
+                entry = json.load(f).get(self.key)
+            return entry["token"], float(entry["issued_at"])
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None
+
+    def store(self, token: str, issued_at: float) -> None:
+        """Write the token for this key, keeping other keys in the file"""
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+            if not isinstance(entries, dict):
+                entries = {}
+        except (OSError, ValueError):
+            entries = {}
+        entries[self.key] = {"token": token, "issued_at": issued_at}
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)))
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+class TokenManager:
+    """Keeps the current token and when it was issued, and fetches a new one
+    shortly before it expires.
+
+    refresh() is single-flight: callers that all saw the same stale token
+    queue on one lock, the first one fetches, and the rest reuse its token.
+    With a FileTokenCache the same applies across processes.
+    """
+
+    def __init__(
+        self,
+        fetch=auth_session,
+        lifetime: float = TOKEN_LIFETIME,
+        refresh_margin: float = TOKEN_REFRESH_MARGIN,
+        cache: FileTokenCache | None = None,
+    ) -> None:
+        self._fetch = fetch
+        self.lifetime = lifetime
+        self.refresh_margin = refresh_margin
+        self.cache = cache
+        self.token: str | None = None
+        self.issued_at = 0.0
+        self.refreshes = 0
+        self._lock = threading.Lock()
+
+    def _fresh(self, issued_at: float) -> bool:
+        return time() < issued_at + self.lifetime - self.refresh_margin
+
+    def current(self) -> str | None:
+        """Return the token if it is outside the refresh margin, else None"""
+        token = self.token
+        if token is not None and self._fresh(self.issued_at):
+            return token
+        return None
+
+    def get(self) -> str:
+        """Return a usable token, refreshing first if it is close to expiry"""
+        return self.current() or self.refresh(stale=self.token)
+
+    def refresh(self, stale: str | None = None) -> str:
+        """Fetch a new token unless another caller already replaced `stale`
+
+        Args:
+            stale (str | None, optional): Token the caller found unusable
+
+        Returns:
+            str: Fresh token
+        """
+        with self._lock:
+            if self.token is not None and self.token != stale:
+                return self.token
+            if self.cache is None:
+                self._fetch_new()
+                return self.token
+            with self.cache.locked():
+                cached = self.cache.load()
+                if cached is not None and cached[0] != stale and self._fresh(cached[1]):
+                    self.token, self.issued_at = cached
+                else:
+                    self._fetch_new()
+                    self.cache.store(self.token, self.issued_at)
+            return self.token
+
+    def _fetch_new(self) -> None:
+        self.token = self._fetch()
+        self.issued_at = time()
+        self.refreshes += 1
+        counters.inc("token_refreshes")
+
+
+class TokenAuth(requests.auth.AuthBase):
+    """requests auth hook that stamps X-Auth-Token on every request and
+    replays a request once with a refreshed token if the controller answers 401
+    """
+
+    def __init__(self, manager: TokenManager) -> None:
+        self.manager = manager
+
+    def __call__(self, r: requests.PreparedRequest) -> requests.PreparedRequest:
+        r.headers["X-Auth-Token"] = self.manager.get()
+        r.register_hook("response", self.handle_401)
+        return r
+
+    def handle_401(self, r: requests.Response, **kwargs) -> requests.Response:
+        if r.status_code != 401:
+            return r
+        token = self.manager.refresh(stale=r.request.headers.get("X-Auth-Token"))
+        r.content  # drain so the connection can be reused
+        r.close()
+        prep = r.request.copy()
+        prep.headers["X-Auth-Token"] = token
+        prep.deregister_hook("response", self.handle_401)
+        retry = r.connection.send(prep, **kwargs)
+        retry.history.append(r)
+        retry.request = prep
+        return retry
+
+
+token_manager = TokenManager()
+
+class TokenBucket:
+    """Token bucket for one endpoint family, shared by every thread and the
+    async engine.
+
+    reserve() never blocks: it takes a token (going into debt if needed) and
+    returns how long the caller must wait before sending, so sync callers
+    sleep() and async callers asyncio.sleep() the same amount. pause() holds
+    the whole family back after a 429, e.g. for its Retry-After.
+    """
+
+    def __init__(self, rate: float | None, burst: float = 1) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.throttled = 0  # 429s seen for this family
+        self._tokens = float(burst)
+        self._updated = monotonic()  # in the future while paused
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token and return the seconds to wait before using it"""
+        with self._lock:
+            now = monotonic()
+            if self.rate is None:
+                return max(0.0, self._updated - now)
+            if now > self._updated:
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+            self._tokens -= 1
+            return (self._updated - now) + max(0.0, -self._tokens) / self.rate
+
+    def pause(self, seconds: float) -> None:
+        """Send nothing for this family for `seconds`, then resume at `rate`"""
+        with self._lock:
+            self.throttled += 1
+            until = monotonic() + seconds
+            if until > self._updated:
+                self._updated = until
+                self._tokens = min(self._tokens, 0.0)
+
+def _make_buckets(limits: dict) -> dict[str, TokenBucket]:
+    return {
+        family: TokenBucket(*limit) if limit else TokenBucket(None)
+        for family, limit in limits.items()
     }
-)
 
-def get_client_details(mac_address: str) -> tuple[str, str]:
-    """Get client details based on MAC Address
+rate_limits = _make_buckets(RATE_LIMITS)
+
+def configure_rate_limits(limits: dict[str, tuple[float, float] | None]) -> None:
+    """Replace the per-family token buckets
+
+    Args:
+        limits (dict): Family -> (requests per second, burst) or None for
+        no throttling, same shape as RATE_LIMITS. Missing families are unthrottled.
+    """
+    global rate_limits
+    rate_limits = _make_buckets({family: None for family in RATE_LIMITS} | limits)
+
+def endpoint_family(url: str) -> str:
+    """Rate limit family a controller URL belongs to"""
+    if "/client-detail" in url:
+        return "client-detail"
+    if "/tasks/" in url:
+        return "tasks"
+    if "/interface/" in url:
+        return "interface"
+    return "other"
+
+def retry_after_seconds(headers, attempt: int) -> float:
+    """Seconds to back off after a 429: the Retry-After header (seconds or
+    HTTP date) when present, otherwise exponential from one second
+    """
+    value = headers.get("Retry-After")
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time())
+            except (TypeError, ValueError):
+                pass
+    return float(2 ** attempt)
+
+# callables(family, status code, seconds) told about every controller response,
+# used by AIMDLimiter to sense congestion. They must be cheap and never raise
+response_listeners: list = []
+
+def notify_response(family: str, status: int, seconds: float) -> None:
+    for listener in response_listeners:
+        listener(family, status, seconds)
+
+_ID_SEGMENT = re.compile(r"/(?=[0-9A-Fa-f-]*[0-9])[0-9A-Fa-f-]{8,}(?=/|$)")
+
+def endpoint_template(url: str) -> str:
+    """Controller URL with host, query and IDs dropped so calls to the same
+    endpoint group together, e.g. /dna/intent/api/v1/tasks/{id}"""
+    path = url.split("?", 1)[0]
+    if "://" in path:
+        path = "/" + path.split("/", 3)[3] if path.count("/") > 2 else "/"
+    return _ID_SEGMENT.sub("/{id}", path)
+
+class Histogram:
+    """Counts of observations per LATENCY_BUCKETS bucket. Fixed buckets keep
+    observe() to a bisect and an increment; percentiles are interpolated
+    within the bucket, so they are accurate to about a bucket width"""
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last bucket is everything above bounds[-1]
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, pct: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = pct / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.bounds[i - 1] if i else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.max
+                return min(self.max, max(self.min, lower + (upper - lower) * (rank - seen) / n))
+            seen += n
+        return self.max
+
+class LatencyRecorder:
+    """In-process latency histograms, keyed by kind ("phase" for steps of a
+    port bounce, "http" for controller calls by method and endpoint template)
+    and name. Safe to use from any thread or the event loop
+    """
+
+    def __init__(self) -> None:
+        self.histograms: dict[tuple[str, str], Histogram] = {}
+        self.lock = threading.Lock()
+        # callables(kind, name, seconds, detail) told about every observation
+        # as it ends, from the thread / asyncio task that did the work. Used by
+        # ccc_trace; they must be cheap and never raise
+        self.listeners: list = []
+
+    def observe(self, kind: str, name: str, seconds: float, **detail) -> None:
+        with self.lock:
+            histogram = self.histograms.get((kind, name))
+            if histogram is None:
+                histogram = self.histograms[(kind, name)] = Histogram()
+            histogram.observe(seconds)
+        for listener in self.listeners:
+            listener(kind, name, seconds, detail)
+
+    @contextmanager
+    def phase(self, name: str, **detail):
+        """Time the body of a with block as phase `name`, failed or not"""
+        start = monotonic()
+        try:
+            yield
+        finally:
+            self.observe("phase", name, monotonic() - start, **detail)
+
+    def summary(self) -> dict[str, dict[str, dict[str, float]]]:
+        """kind -> name -> count, mean, p50, p95, p99 and max in seconds"""
+        with self.lock:
+            out = {}
+            for (kind, name), h in sorted(self.histograms.items()):
+                out.setdefault(kind, {})[name] = {
+                    "count": h.count,
+                    "mean": h.sum / h.count,
+                    "p50": h.percentile(50),
+                    "p95": h.percentile(95),
+                    "p99": h.percentile(99),
+                    "max": h.max,
+                }
+            return out
+
+    def report(self, out=None) -> None:
+        """Print the summary as a table, to stderr by default"""
+        out = out or sys.stderr
+        for kind, names in self.summary().items():
+            print(f"{kind} latency (ms):", file=out)
+            for name, st in names.items():
+                print(
+                    f"    {name:<60} n={st['count']:<7} p50={st['p50'] * 1000:9.1f} "
+                    f"p95={st['p95'] * 1000:9.1f} p99={st['p99'] * 1000:9.1f} max={st['max'] * 1000:9.1f}",
+                    file=out,
+                )
+        out.flush()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.histograms.clear()
+
+latency = LatencyRecorder()
+
+# MAC of the port_bounce() running in this thread / asyncio task, so task
+# waits can be attributed to the bounce that started them
+current_bounce: contextvars.ContextVar[str | None] = contextvars.ContextVar("current_bounce", default=None)
+
+class DeadlineExceeded(Exception):
+    """A port_bounce() ran out of its BOUNCE_DEADLINE budget. `phase` names
+    the step it was in, e.g. "task_wait adminStatus=DOWN"
+    """
+
+    def __init__(self, phase: str, budget: float) -> None:
+        super().__init__(f"Deadline of {budget:g}s ran out during {phase}")
+        self.phase = phase
+        self.budget = budget
+
+class Deadline:
+    """Time budget of one port_bounce(), shared by every step it takes"""
+
+    def __init__(self, seconds: float) -> None:
+        self.seconds = seconds
+        self.expires = monotonic() + seconds
+        self.phase = "start"
+
+    def remaining(self) -> float:
+        return self.expires - monotonic()
+
+    def check(self) -> float:
+        """Seconds left
+
+        Raises:
+            DeadlineExceeded: No time left
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(self.phase, self.seconds)
+        return remaining
+
+# Deadline of the port_bounce() running in this thread / asyncio task. HTTP
+# timeouts, switch slot waits and task waits are clipped to what is left of it
+current_deadline: contextvars.ContextVar[Deadline | None] = contextvars.ContextVar("current_deadline", default=None)
+
+def request_timeout() -> tuple[float, float]:
+    """(connect, read) timeout for a controller call, clipped to the current deadline
+
+    Raises:
+        DeadlineExceeded: The current deadline has already passed
+    """
+    deadline = current_deadline.get()
+    if deadline is None:
+        return CONNECT_TIMEOUT, READ_TIMEOUT
+    remaining = deadline.check()
+    return min(CONNECT_TIMEOUT, remaining), min(READ_TIMEOUT, remaining)
+
+def remaining_time() -> float | None:
+    """Seconds left on the current deadline, None if there is none
+
+    Raises:
+        DeadlineExceeded: The current deadline has already passed
+    """
+    deadline = current_deadline.get()
+    return None if deadline is None else deadline.check()
+
+@contextmanager
+def bounce_phase(name: str, record: bool = True):
+    """Run one step of a port bounce: time it as latency phase `name` (unless
+    record is False) and charge it to the current deadline, so a timeout
+    inside it after the deadline has passed surfaces as DeadlineExceeded(name)
+    """
+    deadline = current_deadline.get()
+    if deadline is None:
+        if record:
+            with latency.phase(name):
+                yield
+        else:
+            yield
+        return
+    previous, deadline.phase = deadline.phase, name
+    try:
+        deadline.check()
+        with latency.phase(name) if record else contextlib.nullcontext():
+            yield
+    except (requests.exceptions.Timeout, TimeoutError) as e:
+        if deadline.remaining() <= 0:
+            raise DeadlineExceeded(name, deadline.seconds) from e
+        raise
+    finally:
+        # once the budget is spent keep the innermost phase, so a cancellation
+        # (asyncio.timeout) can still be reported against it further up
+        if deadline.remaining() > 0:
+            deadline.phase = previous
+
+# ccc_profile.Profiler for --profile / CCC_PROFILE runs, None otherwise
+profiler = None
+
+@contextmanager
+def profile_stage(name: str):
+    """Profile the body of a with block as stage `name` if a profiler is set"""
+    if profiler is None:
+        yield
+        return
+    with profiler.stage(name):
+        yield
+
+class Counters:
+    """Event counts keyed by name and label values, e.g.
+    ("api_calls", ("GET", "/dna/intent/api/v1/tasks/{id}", "200")). Cheap
+    enough to bump on every call; ccc_metrics exports them with the latency
+    histograms
+    """
+
+    def __init__(self) -> None:
+        self.values: dict[tuple[str, tuple[str, ...]], int] = {}
+        self.lock = threading.Lock()
+
+    def inc(self, name: str, *labels: str, n: int = 1) -> None:
+        key = (name, labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + n
+
+    def snapshot(self) -> dict[tuple[str, tuple[str, ...]], int]:
+        with self.lock:
+            return dict(self.values)
+
+    def reset(self) -> None:
+        with self.lock:
+            self.values.clear()
+
+counters = Counters()
+
+def enable_latency_report() -> None:
+    """Print latency.report() when the process exits, and whenever it gets
+    SIGUSR1 (kill -USR1 <pid>) for a look at a long run in progress. main()
+    calls this for --timings or CCC_TIMINGS=1"""
+    atexit.register(latency.report)
+    if hasattr(signal, "SIGUSR1") and threading.current_thread() is threading.main_thread():
+        # the handler runs on the main thread between bytecodes, maybe while
+        # it holds latency.lock, so it only wakes a thread that reports
+        requested = threading.Event()
+
+        def reporter() -> None:
+            while requested.wait():
+                requested.clear()
+                latency.report()
+
+        threading.Thread(target=reporter, name="latency_report", daemon=True).start()
+        signal.signal(signal.SIGUSR1, lambda signum, frame: requested.set())
+
+class ControllerSession(requests.Session):
+    """requests Session that paces every call through the endpoint family's
+    TokenBucket and retries 429s after their Retry-After instead of failing
+    """
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        family = endpoint_family(request.url)
+        path = endpoint_template(request.url)
+        endpoint = f"{request.method} {path}"
+        bucket = rate_limits[family]
+        default_timeout = kwargs.get("timeout") is None
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            delay = bucket.reserve()
+            if delay:
+                remaining = remaining_time()
+                if remaining is not None and delay >= remaining:
+                    deadline = current_deadline.get()
+                    raise DeadlineExceeded(deadline.phase, deadline.seconds)
+                sleep(delay)
+                latency.observe("phase", f"rate_limit_wait {family}", delay)
+            if default_timeout:
+                kwargs["timeout"] = request_timeout()
+            start = monotonic()
+            r = super().send(request, **kwargs)
+            elapsed = monotonic() - start
+            latency.observe("http", endpoint, elapsed, status=r.status_code)
+            counters.inc("api_calls", request.method, path, str(r.status_code))
+            if r.status_code == 429:
+                counters.inc("rate_limited", family)
+            notify_response(family, r.status_code, elapsed)
+            if r.status_code != 429 or attempt == RATE_LIMIT_RETRIES:
+                return r
+            bucket.pause(retry_after_seconds(r.headers, attempt))
+            r.close()
+        return r
+
+class PoolAdapter(requests.adapters.HTTPAdapter):
+    """HTTPAdapter that also turns on TCP keepalive for its pooled connections,
+    so idle controller connections survive long task waits behind firewalls
+    and load balancers instead of being re-established with a new TLS handshake
+    """
+
+    def __init__(self, keepalive_idle: int | None = TCP_KEEPALIVE_IDLE, **kwargs) -> None:
+        self.keepalive_idle = keepalive_idle  # read by init_poolmanager below
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        options = list(urllib3.connection.HTTPConnection.default_socket_options)
+        if self.keepalive_idle is not None:
+            options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+            if hasattr(socket, "TCP_KEEPIDLE"):  # not on macOS/Windows
+                options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, self.keepalive_idle))
+                options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, max(1, self.keepalive_idle // 4)))
+        kwargs["socket_options"] = options
+        super().init_poolmanager(*args, **kwargs)
+
+def get_session() -> requests.Session:
+    """Return the shared session. The token is fetched by token_manager on
+    the first request and refreshed from then on as needed, and calls are
+    paced per endpoint family by rate_limits
+
+    Returns:
+        requests.Session: Session with token auth and JSON headers set
+    """
+    global _session
+    if _session is not None:
+        return _session
+    _load_config()
+    with _session_lock:
+        if _session is None:
+            s = ControllerSession()
+            s.verify = False
+            s.auth = TokenAuth(token_manager)
+            s.mount(CCC_URL, PoolAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE, pool_block=POOL_BLOCK))
+            s.headers.update(
+                {
+                    "content-type": "application/json",
+                    "Accept": "application/json",
+                }
+            )
+            _session = s
+    return _session
+
+def __getattr__(name: str):
+    """Keep `ccc_example.s`, `.token` and the CCC_* settings working for
+    importers while still deferring them until first access
+    """
+    if name == "s":
+        return get_session()
+    if name == "token":
+        _load_config()
+        return token_manager.get()
+    if name in ("CCC_URL", "CCC_UN", "CCC_PW"):
+        _load_config()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def configure_pool(
+    maxsize: int | None = None,
+    block: bool | None = None,
+    keepalive_idle: int | None = -1,
+) -> None:
+    """Replace the connection pool the shared session uses for CCC_URL.
+    Arguments left at their defaults keep the current pool's setting
+
+    Args:
+        maxsize (int | None, optional): Connections kept open to the controller,
+        should be at least the number of threads sharing the session
+        block (bool | None, optional): Wait for a free pooled connection
+        instead of opening extra ones that are discarded after use
+        keepalive_idle (int | None, optional): Seconds idle before TCP
+        keepalive probes, None turns TCP keepalive off
+    """
+    s = get_session()
+    with _session_lock:
+        current = s.get_adapter(CCC_URL)
+        if maxsize is None:
+            maxsize = getattr(current, "_pool_maxsize", POOL_MAXSIZE)
+        if block is None:
+            block = getattr(current, "_pool_block", POOL_BLOCK)
+        if keepalive_idle == -1:
+            keepalive_idle = getattr(current, "keepalive_idle", TCP_KEEPALIVE_IDLE)
+        s.mount(
+            CCC_URL,
+            PoolAdapter(
+                pool_connections=1,
+                pool_maxsize=maxsize,
+                pool_block=block,
+                keepalive_idle=keepalive_idle,
+            ),
+        )
+
+def _size_session_pool(max_workers: int) -> None:
+    """Grow the pool so every worker thread plus the task poller threads can
+    hold a connection, otherwise urllib3 opens and discards extras on every
+    call and logs "Connection pool is full"
+
+    Args:
+        max_workers (int): Number of threads that will share the session
+    """
+    needed = max_workers + TASK_POLL_WORKERS
+    if getattr(get_session().get_adapter(CCC_URL), "_pool_maxsize", 0) < needed:
+        configure_pool(maxsize=needed)
+
+class TTLCache:
+    """Thread-safe LRU cache where each entry also expires `ttl` seconds
+    after it was stored. Keeps hit/miss/eviction/expiry counters.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value, or None on a miss or expired entry"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if monotonic() >= expires_at:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value) -> None:
+        with self._lock:
+            self._data[key] = (value, monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+client_cache = TTLCache(maxsize=CLIENT_CACHE_SIZE, ttl=CLIENT_CACHE_TTL)
+
+def get_client_details(mac_address: str, use_cache: bool = True) -> tuple[str, str]:
+    """Get client details based on MAC Address. Results are kept in
+    client_cache for CLIENT_CACHE_TTL seconds
 
     Args:
         mac_address (str): MAC address of device in the form of AA:AA:AA..
+        use_cache (bool, optional): Serve from / store into client_cache. Defaults to True.
 
     Raises:
         Exception: Empty response from the server
@@ -71,17 +877,38 @@ def get_client_details(mac_address: str) -> tuple[str, str]:
     Returns:
         tuple[str, str]: Connected Interface Name, and Parent Device UUID
     """
+    if use_cache:
+        cached = client_cache.get(mac_address.upper())
+        if cached is not None:
+            return cached
+    s = get_session()
     query = f"?macAddress={mac_address}"
     url = f"{CCC_URL}/dna/intent/api/v1/client-detail{query}"
     r = s.get(url=url)
     r.raise_for_status()
-    if r.text == "":
-        raise Exception("Empty Response from the server.")
-    json_resp = r.json()
+    client_details = parse_client_details(decode_json(r.content))
+    if use_cache:
+        client_cache.put(mac_address.upper(), client_details)
+    return client_details
+
+def parse_client_details(json_resp: dict) -> tuple[str, str]:
+    """Pull the interface name and parent device UUID out of a client-detail
+    response. Shared by the sync and async code paths.
+
+    Args:
+        json_resp (dict): Decoded client-detail response
+
+    Raises:
+        Exception: Unable to obtain parent UUID from response
+
+    Returns:
+        tuple[str, str]: Connected Interface Name, and Parent Device UUID
+    """
     interface_name = json_resp["detail"]["port"]
+    parent_device_uuid = None
     try:
         parent_device_uuid = json_resp.get("detail", {}).get("connectedDevice", {})[0]['id']
-    except KeyError:
+    except (KeyError, IndexError):
         pass
     if not parent_device_uuid: # fallback method best effort
         try:
@@ -93,14 +920,82 @@ def get_client_details(mac_address: str) -> tuple[str, str]:
             raise Exception("Unable to get parent device UUID from client details")
     return interface_name, parent_device_uuid
 
+# device UUID -> {interface name: (interface UUID, adminStatus)}
+interface_index = TTLCache(maxsize=INTERFACE_INDEX_SIZE, ttl=INTERFACE_INDEX_TTL)
+_index_locks: dict[str, threading.Lock] = {}
+
+def get_device_interfaces(parent_device_uuid: str) -> dict[str, tuple[str, str]]:
+    """Fetch every interface on a device in one call and index it by name
+
+    Args:
+        parent_device_uuid (str): UUID of parent device
+
+    Raises:
+        Exception: Empty response from the server
+
+    Returns:
+        dict[str, tuple[str, str]]: Interface name -> (Interface UUID, Interface Status)
+    """
+    s = get_session()
+    url = f"{CCC_URL}/dna/intent/api/v1/interface/network-device/{parent_device_uuid}"
+    r = s.get(url=url)
+    r.raise_for_status()
+    return index_device_interfaces(decode_json(r.content))
+
+def index_device_interfaces(json_resp: dict) -> dict[str, tuple[str, str]]:
+    """Build the name -> (UUID, adminStatus) map from a device interface list
+    response. Shared by the sync and async code paths.
+
+    Args:
+        json_resp (dict): Decoded interface/network-device response
+
+    Returns:
+        dict[str, tuple[str, str]]: Interface name -> (Interface UUID, Interface Status)
+    """
+    index = {}
+    for interface in json_resp.get("response") or []:
+        name = interface.get("portName")
+        interface_uuid = interface.get("id")
+        status = interface.get("adminStatus")
+        if name and interface_uuid and status:
+            index[name] = (interface_uuid, status)
+    return index
+
+def _device_interface_index(parent_device_uuid: str) -> dict[str, tuple[str, str]]:
+    """Return the cached index for a device, fetching it once even when many
+    threads ask for the same device at the same time
+    """
+    index = interface_index.get(parent_device_uuid)
+    if index is not None:
+        return index
+    with _session_lock:
+        lock = _index_locks.setdefault(parent_device_uuid, threading.Lock())
+    with lock:
+        index = interface_index.get(parent_device_uuid)
+        if index is None:
+            index = get_device_interfaces(parent_device_uuid)
+            interface_index.put(parent_device_uuid, index)
+    return index
+
+def forget_interface(parent_device_uuid: str, interface_name: str) -> None:
+    """Drop one interface from the index after its admin status was changed,
+    so the next lookup asks the controller for its real state
+    """
+    index = interface_index.get(parent_device_uuid)
+    if index is not None:
+        index.pop(interface_name, None)
+
 def get_interface_details(
-    parent_device_uuid: str, interface_name: str
+    parent_device_uuid: str, interface_name: str, use_index: bool = True
 ) -> tuple[str, str]:
-    """Get interface details on parent device based on interface name
+    """Get interface details on parent device based on interface name. Served
+    from the per-device interface_index when possible, falling back to the
+    interface-name lookup for ports not in the index
 
     Args:
         parent_device_uuid (str): UUID of parent device
         interface_name (str): Interface name e.g "GigabitEthernet1/0/3"
+        use_index (bool, optional): Use the per-device interface_index. Defaults to True.
 
     Raises:
         Exception: Empty response from the server
@@ -109,13 +1004,30 @@ def get_interface_details(
     Returns:
         tuple[str, str]: Interface UUID, and Interface Status (UP/DOWN)
     """
+    if use_index:
+        interface_details = _device_interface_index(parent_device_uuid).get(interface_name)
+        if interface_details is not None:
+            return interface_details
+    s = get_session()
     query = f"?name={interface_name}"
     url = f"{CCC_URL}/dna/intent/api/v1/interface/network-device/{parent_device_uuid}/interface-name{query}"
     r = s.get(url=url)
     r.raise_for_status()
-    if r.text == "":
-        raise Exception("Empty Response from the server.")
-    json_resp = r.json()
+    return parse_interface_details(decode_json(r.content))
+
+def parse_interface_details(json_resp: dict) -> tuple[str, str]:
+    """Pull the interface UUID and admin status out of an interface-name
+    response. Shared by the sync and async code paths.
+
+    Args:
+        json_resp (dict): Decoded interface-name response
+
+    Raises:
+        Exception: Unable to locate interface details
+
+    Returns:
+        tuple[str, str]: Interface UUID, and Interface Status (UP/DOWN)
+    """
     interface_uuid = json_resp.get("response", {}).get("id", {})
     current_interface_status = json_resp.get("response", {}).get("adminStatus", {})
     if not interface_uuid or not current_interface_status:
@@ -134,12 +1046,210 @@ def lookup_task(task_id: str) -> dict:
     Returns:
         dict: Status of the submitted task
     """
+    s = get_session()
     url = f"{CCC_URL}/dna/intent/api/v1/tasks/{task_id}"
     r = s.get(url=url)
     r.raise_for_status()
-    if r.text == "":
-        raise Exception("Empty Response from the server.")
-    return r.json()
+    return decode_json(r.content)
+
+class PollSchedule:
+    """Decides when a pending task is looked up next.
+
+    The first lookup waits for most of the time tasks of the same operation
+    have historically taken (an EWMA of observed completion times), so fast
+    tasks are not left idle and slow ones are not polled pointlessly. After
+    that the gap grows exponentially from TASK_POLL_FIRST up to TASK_POLL_MAX,
+    with jitter.
+    """
+
+    def __init__(
+        self,
+        first: float = TASK_POLL_FIRST,
+        maximum: float = TASK_POLL_MAX,
+        factor: float = TASK_POLL_BACKOFF,
+        jitter: float = TASK_POLL_JITTER,
+        alpha: float = 0.2,
+    ) -> None:
+        self.first = first
+        self.maximum = maximum
+        self.factor = factor
+        self.jitter = jitter
+        self.alpha = alpha
+        self._durations: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _jittered(self, delay: float) -> float:
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def initial_delay(self, operation: str | None) -> float:
+        """Delay before the first lookup of a task just submitted"""
+        learned = self._durations.get(operation)
+        if learned is None:
+            return self.first
+        # poll a little before the typical finish, observed times overshoot
+        return self._jittered(max(self.first, 0.8 * learned))
+
+    def next_delay(self, attempt: int) -> float:
+        """Delay before lookup number `attempt` + 1 of a still PENDING task"""
+        return self._jittered(min(self.maximum, self.first * self.factor ** attempt))
+
+    def record(self, operation: str | None, seconds: float) -> None:
+        """Feed the observed submit -> SUCCESS time of a finished task"""
+        if operation is None:
+            return
+        with self._lock:
+            previous = self._durations.get(operation)
+            if previous is None:
+                self._durations[operation] = seconds
+            else:
+                self._durations[operation] = previous + self.alpha * (seconds - previous)
+
+    def learned(self) -> dict[str, float]:
+        with self._lock:
+            return dict(self._durations)
+
+class TaskWaiter:
+    """Waits on many controller tasks from one background thread.
+
+    Callers submit a task ID and get a Future back. Every outstanding task is
+    polled from the same loop, each on its own PollSchedule timing, with the
+    lookups that fall due together fanned out over a small pool; the tasks
+    API has no multi-ID query, so this is as close to batching as the
+    controller allows. Futures resolve with the task details on SUCCESS and
+    with an exception on anything else, so N concurrent bounces cost one
+    polling loop instead of N.
+    """
+
+    def __init__(
+        self,
+        lookup,
+        schedule: PollSchedule | None = None,
+        workers: int = TASK_POLL_WORKERS,
+    ) -> None:
+        self._lookup = lookup
+        self.schedule = schedule or PollSchedule()
+        self.workers = workers
+        self.polls = 0
+        # task ID -> [Future, next poll time, polls so far, submit time, operation]
+        self._pending: dict[str, list] = {}
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._pool: ThreadPoolExecutor | None = None
+
+    def submit(self, task_id: str, operation: str | None = None) -> Future:
+        """Start tracking a task
+
+        Args:
+            task_id (str): ID of the task
+            operation (str | None, optional): Kind of change the task makes,
+            used to learn how long such tasks usually take. Defaults to None.
+
+        Returns:
+            Future: Resolves to the task details once the task succeeds
+        """
+        with self._cond:
+            if task_id in self._pending:
+                return self._pending[task_id][0]
+            future = Future()
+            now = monotonic()
+            name = f"task_wait {operation}" if operation else "task_wait"
+            mac_address = current_bounce.get()
+            future.add_done_callback(
+                lambda f: f.cancelled()
+                or latency.observe("phase", name, monotonic() - now, task_id=task_id, mac=mac_address)
+            )
+            self._pending[task_id] = [
+                future, now + self.schedule.initial_delay(operation), 0, now, operation
+            ]
+            if self._thread is None:
+                self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="task_poll")
+                self._thread = threading.Thread(target=self._run, name="task_waiter", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return future
+
+    def wait(
+        self, task_id: str, operation: str | None = None, timeout: float | None = None
+    ) -> dict:
+        """Block until a task finishes
+
+        Raises:
+            Exception: Interface update task failed
+            TimeoutError: Still running after `timeout` seconds, the task is no longer tracked
+
+        Returns:
+            dict: Status of the finished task
+        """
+        future = self.submit(task_id, operation)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            self.cancel(task_id)
+            raise
+
+    def cancel(self, task_id: str) -> None:
+        """Stop tracking a task and cancel its Future. The change itself
+        carries on on the controller, it just isn't polled any more"""
+        with self._cond:
+            entry = self._pending.pop(task_id, None)
+        if entry is not None:
+            entry[0].cancel()
+
+    def _due(self) -> list[str]:
+        """Sleep until at least one task is due a lookup and return those IDs"""
+        with self._cond:
+            while True:
+                now = monotonic()
+                due = [task_id for task_id, entry in self._pending.items() if entry[1] <= now]
+                if due:
+                    return due
+                next_at = min((entry[1] for entry in self._pending.values()), default=None)
+                self._cond.wait(None if next_at is None else next_at - now)
+
+    def _poll(self, task_id: str) -> tuple[str, str | None, dict | None, Exception | None]:
+        """Look up one task. Never raises, so one bad lookup or malformed
+        response fails that task's Future instead of the polling thread
+
+        Returns:
+            tuple: (task ID, status, task details, None) or (task ID, None, None, error)
+        """
+        try:
+            task_details = self._lookup(task_id)
+            status = task_details["response"]["status"]
+            if not isinstance(status, str):
+                raise TypeError(f"Task status is {type(status).__name__}, not str")
+            return task_id, status, task_details, None
+        except Exception as e:
+            return task_id, None, None, e
+
+    def _run(self) -> None:
+        while True:
+            due = self._due()
+            results = list(self._pool.map(self._poll, due))
+            with self._cond:
+                self.polls += len(due)
+                now = monotonic()
+                for task_id, status, task_details, error in results:
+                    entry = self._pending.get(task_id)
+                    if entry is None:
+                        continue  # cancelled while it was being looked up
+                    future = entry[0]
+                    if status == "PENDING":
+                        entry[2] += 1
+                        entry[1] = now + self.schedule.next_delay(entry[2])
+                        continue
+                    del self._pending[task_id]
+                    if not future.set_running_or_notify_cancel():
+                        continue  # its waiter gave up, e.g. an asyncio task was cancelled
+                    if error is not None:
+                        future.set_exception(error)
+                    elif status == "SUCCESS":
+                        self.schedule.record(entry[4], now - entry[3])
+                        future.set_result(task_details)
+                    else:
+                        future.set_exception(Exception("Interface update task failed"))
+
+task_waiter = TaskWaiter(lambda task_id: lookup_task(task_id=task_id))
 
 def interface_shut_no_shut(
     interface_uuid: str, current_interface_status: str, mode: str = "Deploy"
@@ -159,77 +1269,1047 @@ def interface_shut_no_shut(
         Exception: Interface status update failed
         Exception: Empty Response from the server
     """
+    s = get_session()
     query = f"?deploymentMode={mode}"
     url = f"{CCC_URL}/dna/intent/api/v1/interface/{interface_uuid}{query}"
     if current_interface_status == "DOWN":
-        r1 = s.put(url=url, json={"adminStatus": "UP"})
+        with bounce_phase("put adminStatus=UP"):
+            r1 = s.put(url=url, json={"adminStatus": "UP"})
+        if r1.status_code == 400 and b"No change in setting" in r1.content:
+            return  # the UP of an earlier bounce on this port landed meanwhile
         r1.raise_for_status()
-        if r1.text == "":
-            raise Exception("Empty Response from the server.")
-        resp1 = r1.json()
-        while True:
-            task_details = lookup_task(task_id=resp1["response"]["taskId"])
-            if task_details["response"]["status"] == "PENDING":
-                sleep(1)
-                continue
-            elif task_details["response"]["status"] == "SUCCESS":
-                break
-            elif task_details["response"]["status"] != "SUCCESS":
-                raise Exception("Interface update task failed")
+        resp1 = decode_json(r1.content)
+        with bounce_phase("task_wait adminStatus=UP", record=False):
+            task_waiter.wait(resp1["response"]["taskId"], operation="adminStatus=UP", timeout=remaining_time())
     elif current_interface_status == "UP":
-        r1 = s.put(url=url, json={"adminStatus": "DOWN"})
-        r1.raise_for_status()
-        if r1.text == "":
+        down_task = None
+        try:
+            with bounce_phase("put adminStatus=DOWN"):
+                r1 = s.put(url=url, json={"adminStatus": "DOWN"})
+            if r1.status_code < 400:
+                down_task = decode_json(r1.content)["response"]["taskId"]
+                with bounce_phase("task_wait adminStatus=DOWN", record=False):
+                    task_waiter.wait(down_task, operation="adminStatus=DOWN", timeout=remaining_time())
+        except Exception as e:
+            # the DOWN went out (or may have), so the UP is sent whatever happened
+            restore_admin_up(url, down_task=down_task, after=e)
+            raise
+        r1.raise_for_status()  # the controller refused the DOWN, nothing to undo
+        restore_admin_up(url)
+    return
+
+def restore_admin_up(url: str, down_task: str | None = None, after: BaseException | None = None) -> None:
+    """Send the admin-UP that ends a bounce. Once a DOWN has gone out this is
+    sent no matter how the bounce went, outside its deadline with only the
+    per-request timeouts, so a port is never left shut because the budget ran
+    out or a task wait failed. A still pending DOWN task is given up to
+    RESTORE_WAIT to land first: an UP sent before it is answered "No change
+    in setting" and the DOWN then shuts the port anyway
+
+    Args:
+        url (str): Interface URL, with the deploymentMode query
+        down_task (str | None, optional): Task ID of the DOWN if the bounce
+        gave up before it finished. Defaults to None.
+        after (BaseException | None, optional): What ended the bounce early,
+        if anything. Defaults to None.
+
+    Raises:
+        Exception: Empty Response from the server
+        Exception: The UP failed after `after`, the port may be left DOWN
+    """
+    deadline = current_deadline.get()
+    token = current_deadline.set(None)
+    try:
+        if down_task is not None:
+            try:
+                task_waiter.wait(down_task, operation="adminStatus=DOWN", timeout=RESTORE_WAIT)
+            except Exception:
+                pass  # failed or still pending, the UP is the best left to do
+        with latency.phase("put adminStatus=UP"):
+            r2 = get_session().put(url=url, json={"adminStatus": "UP"})
+        if r2.status_code == 400 and b"No change in setting" in r2.content:
+            return
+        r2.raise_for_status()
+        if not r2.content:
             raise Exception("Empty Response from the server.")
-        resp1 = r1.json()
-        while True:
-            task_details = lookup_task(task_id=resp1["response"]["taskId"])
-            if task_details["response"]["status"] == "PENDING":
-                sleep(1)
-                continue
-            elif task_details["response"]["status"] == "SUCCESS":
-                break
+    except Exception as e:
+        if after is None:
+            raise
+        raise restore_failure(after, e, deadline) from after
+    finally:
+        current_deadline.reset(token)
+
+def restore_failure(after: BaseException, error: Exception, deadline: Deadline | None) -> Exception:
+    """Error for a restoring admin-UP that failed after `after` ended the bounce"""
+    reason = str(after)
+    if not reason:  # a bare asyncio cancellation, normally the deadline's
+        expired = deadline is not None and deadline.remaining() <= 0
+        reason = str(DeadlineExceeded(deadline.phase, deadline.seconds)) if expired else "Cancelled"
+    return Exception(f"{reason}; adminStatus=UP failed, port may be left DOWN: {error}")
+
+def submit_admin_status(interface_uuid: str, admin_status: str, mode: str = "Deploy") -> str:
+    """PUT a new admin status on an interface without waiting for the task
+
+    Args:
+        interface_uuid (str): UUID of interface
+        admin_status (str): UP or DOWN
+        mode (str, optional): Dry run vs deploy. Defaults to "Deploy".
+
+    Raises:
+        requests.exceptions.HTTPError: Controller rejected the change
+        Exception: Empty Response from the server
+
+    Returns:
+        str: ID of the task applying the change
+    """
+    s = get_session()
+    query = f"?deploymentMode={mode}"
+    url = f"{CCC_URL}/dna/intent/api/v1/interface/{interface_uuid}{query}"
+    r = s.put(url=url, json={"adminStatus": admin_status})
+    r.raise_for_status()
+    return decode_json(r.content)["response"]["taskId"]
+
+class KeyedSemaphore:
+    """A semaphore per key (e.g. per parent switch UUID), created on first use"""
+
+    def __init__(self, value: int) -> None:
+        self.value = value
+        self._semaphores: dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def hold(self, key: str, timeout: float | None = None):
+        """Hold one of `key`'s slots for the body of a with block
+
+        Raises:
+            TimeoutError: No slot came free within `timeout` seconds
+        """
+        with self._lock:
+            semaphore = self._semaphores.get(key)
+            if semaphore is None:
+                semaphore = self._semaphores[key] = threading.BoundedSemaphore(self.value)
+        if not semaphore.acquire(timeout=timeout):
+            raise TimeoutError(f"No free slot for {key} within {timeout:g}s")
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+switch_writes = KeyedSemaphore(SWITCH_WRITE_CONCURRENCY)
+
+def configure_switch_writes(per_switch: int) -> None:
+    """Set how many interface changes may run at once on the same switch"""
+    global switch_writes
+    switch_writes = KeyedSemaphore(per_switch)
+
+# "<parent device UUID>/<interface name>" -> Future of the bounce running on
+# that port. The pair names exactly one interface UUID and is known straight
+# from get_client_details(), before any interface lookup or switch slot wait
+_inflight_bounces: dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+def port_bounce(mac_address: str, mode: str = "Deploy") -> None:
+    """Performs a shut no shut operation on a POE device based on MAC address.
+    If the same port is already being bounced (e.g. phone and PC behind one
+    port, or a repeated alert) the call joins that bounce and shares its
+    outcome instead of sending more PUTs
+
+    Every controller call, switch slot wait and task wait of the bounce is
+    limited to what is left of its BOUNCE_DEADLINE, so a hung controller
+    fails the bounce instead of blocking its worker
+
+    Args:
+        mac_address (str): MAC address of the device to port bounce
+        mode (str, optional): Option to dry run vs deploy changes. Defaults to "Deploy".
+
+    Raises:
+        DeadlineExceeded: BOUNCE_DEADLINE ran out, `phase` says during which step
+    """
+    counters.inc("bounces_attempted")
+    bounce = current_bounce.set(mac_address)
+    deadline = current_deadline.set(Deadline(BOUNCE_DEADLINE) if BOUNCE_DEADLINE else None)
+    try:
+        with latency.phase("port_bounce", mac=mac_address):
+            _port_bounce(mac_address, mode)
+    except Exception:
+        counters.inc("bounces_failed")
+        raise
+    finally:
+        current_deadline.reset(deadline)
+        current_bounce.reset(bounce)
+    counters.inc("bounces_succeeded")
+
+def _port_bounce(mac_address: str, mode: str) -> None:
+    with bounce_phase("client_details"):
+        interface_name, parent_device_uuid = get_client_details(
+            mac_address=mac_address
+        )
+    port = f"{parent_device_uuid}/{interface_name}"
+    with _inflight_lock:
+        shared = _inflight_bounces.get(port)
+        if shared is None:
+            future = _inflight_bounces[port] = Future()
+    if shared is not None:
+        try:
+            with bounce_phase("joined_bounce", record=False):
+                shared.result(timeout=remaining_time())
+        except Exception:
+            client_cache.pop(mac_address.upper())
+            raise
+        return
+    try:
+        _bounce_port(mac_address, parent_device_uuid, interface_name, mode)
+        future.set_result(None)
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            del _inflight_bounces[port]
+    return
+
+def _bounce_port(
+    mac_address: str, parent_device_uuid: str, interface_name: str, mode: str
+) -> None:
+    """Shut no shut one resolved port. The interface lookup and change hold
+    the parent switch's switch_writes slot, so changes to one switch are
+    serialised while different switches run in parallel
+    """
+    try:
+        start = monotonic()
+        with (
+            bounce_phase("switch_wait", record=False),
+            switch_writes.hold(parent_device_uuid, timeout=remaining_time()),
+        ):
+            latency.observe("phase", "switch_wait", monotonic() - start)
+            with bounce_phase("interface_details"):
+                interface_uuid, current_interface_status = get_interface_details(
+                    parent_device_uuid=parent_device_uuid,
+                    interface_name=interface_name
+                )
+            interface_shut_no_shut(
+                interface_uuid=interface_uuid,
+                current_interface_status=current_interface_status,
+                mode=mode
+            )
+    except Exception:
+        # the client may have moved, make a retry look it up again
+        client_cache.pop(mac_address.upper())
+        raise
+    finally:
+        forget_interface(parent_device_uuid, interface_name)
+
+def _left(end: float | None) -> float | None:
+    """Seconds until monotonic time `end`, None for no limit"""
+    return None if end is None else max(0.0, end - monotonic())
+
+def _bounce_switch_in_waves(
+    parent_device_uuid: str, ports: dict[str, list[str]], mode: str
+) -> dict[str, Exception | None]:
+    """Bounce many ports on one switch: submit every DOWN, wait for all of
+    them, then submit every UP and wait for those. Each wave waits at most
+    BOUNCE_DEADLINE for its tasks; a port whose DOWN task is still pending
+    then gets up to RESTORE_WAIT more before its UP, and an error if the
+    DOWN never settles
+
+    Args:
+        parent_device_uuid (str): UUID of the switch
+        ports (dict[str, list[str]]): Interface name -> MACs seen on it
+        mode (str): Dry run vs deploy
+
+    Returns:
+        dict[str, Exception | None]: MAC -> None on success, or the exception raised
+    """
+    results = {}
+
+    def settle(interface_name: str, error: Exception | None) -> None:
+        for mac_address in ports[interface_name]:
+            results[mac_address] = error
+
+    with switch_writes.hold(parent_device_uuid):
+        interfaces = {}
+        for interface_name in ports:
+            try:
+                interfaces[interface_name] = get_interface_details(
+                    parent_device_uuid=parent_device_uuid, interface_name=interface_name
+                )
+            except Exception as e:
+                settle(interface_name, e)
+        down_tasks = {}
+        up_ready = []
+        for interface_name, (interface_uuid, status) in interfaces.items():
+            if status == "UP":
+                try:
+                    task_id = submit_admin_status(interface_uuid, "DOWN", mode)
+                    task_waiter.submit(task_id, operation="adminStatus=DOWN")
+                    down_tasks[interface_name] = task_id
+                except Exception as e:
+                    settle(interface_name, e)
+            elif status == "DOWN":
+                up_ready.append(interface_name)
             else:
-                raise Exception("Interface update task failed")
+                settle(interface_name, None)  # same as interface_shut_no_shut
+        wave_end = None if BOUNCE_DEADLINE is None else monotonic() + BOUNCE_DEADLINE
+        late_downs = {}
+        for interface_name, task_id in down_tasks.items():
+            try:
+                task_waiter.wait(task_id, operation="adminStatus=DOWN", timeout=_left(wave_end))
+                up_ready.append(interface_name)
+            except TimeoutError:
+                late_downs[interface_name] = task_id
+            except Exception as e:
+                settle(interface_name, e)
+        # an UP sent while its DOWN is pending is a "No change" and the DOWN
+        # then lands, so like restore_admin_up give late DOWNs RESTORE_WAIT
+        restore_end = monotonic() + RESTORE_WAIT
+        for interface_name, task_id in late_downs.items():
+            try:
+                task_waiter.wait(task_id, operation="adminStatus=DOWN", timeout=_left(restore_end))
+                up_ready.append(interface_name)
+            except TimeoutError:
+                settle(interface_name, Exception(
+                    f"adminStatus=DOWN task {task_id} still pending after the wave deadline "
+                    f"and {RESTORE_WAIT}s, admin-UP not sent, port may be left shut"
+                ))
+            except Exception as e:
+                settle(interface_name, e)
+        up_tasks = {}
+        for interface_name in up_ready:
+            try:
+                task_id = submit_admin_status(interfaces[interface_name][0], "UP", mode)
+                task_waiter.submit(task_id, operation="adminStatus=UP")
+                up_tasks[interface_name] = task_id
+            except requests.exceptions.HTTPError as e:
+                settle(interface_name, None if b"No change in setting" in e.response.content else e)
+            except Exception as e:
+                settle(interface_name, e)
+        wave_end = None if BOUNCE_DEADLINE is None else monotonic() + BOUNCE_DEADLINE
+        for interface_name, task_id in up_tasks.items():
+            try:
+                task_waiter.wait(task_id, operation="adminStatus=UP", timeout=_left(wave_end))
+                settle(interface_name, None)
+            except Exception as e:
+                settle(interface_name, e)
+        for interface_name in ports:
+            forget_interface(parent_device_uuid, interface_name)
+    return results
+
+def port_bounce_waves(
+    macs: list[str], mode: str = "Deploy", max_workers: int = DEFAULT_MAX_WORKERS
+) -> dict[str, Exception | None]:
+    """Bounce many MAC addresses switch by switch in two waves. Each switch
+    gets all of its admin-DOWN PUTs, one collective wait, then all of its
+    admin-UP PUTs, so a batch's outage is about one task cycle per switch
+    rather than one per port. Switches run in parallel and MACs sharing a
+    port are bounced once
+
+    Args:
+        macs (list[str]): MAC addresses to port bounce, in any notation
+        mode (str, optional): Option to dry run vs deploy changes. Defaults to "Deploy".
+        max_workers (int, optional): Client lookups / switches in flight. Defaults to DEFAULT_MAX_WORKERS.
+
+    Returns:
+        dict[str, Exception | None]: Normalized MAC -> None on success, or the
+        exception raised. Invalid values map to an Exception and are not sent
+    """
+    macs, invalid = clean_macs(macs)
+    _size_session_pool(max_workers)
+    results = {}
+    switches: dict[str, dict[str, list[str]]] = {}
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="port_bounce") as pool:
+        with profile_stage("client_lookups"):
+            lookups = {
+                mac_address: pool.submit(get_client_details, mac_address=mac_address)
+                for mac_address in macs
+            }
+            for mac_address, future in lookups.items():
+                try:
+                    interface_name, parent_device_uuid = future.result()
+                except Exception as e:
+                    results[mac_address] = e
+                    continue
+                switches.setdefault(parent_device_uuid, {}).setdefault(interface_name, []).append(mac_address)
+        with profile_stage("switch_waves"):
+            waves = [
+                pool.submit(_bounce_switch_in_waves, parent_device_uuid, ports, mode)
+                for parent_device_uuid, ports in switches.items()
+            ]
+            for future in waves:
+                results.update(future.result())
+    failed = 0
+    for mac_address, error in results.items():
+        if error is not None:
+            client_cache.pop(mac_address.upper())
+            failed += 1
+    counters.inc("bounces_attempted", n=len(results))
+    counters.inc("bounces_failed", n=failed)
+    counters.inc("bounces_succeeded", n=len(results) - failed)
+    return {**{mac_address: results[mac_address] for mac_address in macs}, **invalid}
+
+class AIMDLimiter:
+    """Adaptive limit on bounces in flight (additive increase, multiplicative
+    decrease, as in TCP congestion control).
+
+    While controller responses come back healthy and call latency stays near
+    its baseline, the limit grows by about one per limit's worth of successful
+    calls. A 429, a 5xx or a call slower than AIMD_LATENCY_TOLERANCE x the
+    baseline of its endpoint family cuts it by AIMD_DECREASE, at most once
+    per cooldown so one burst of errors counts as one congestion event.
+    Baselines are kept per family because task polls, client lookups and
+    interface PUTs have very different normal latencies, and follow spikes
+    too (more slowly) so a lasting latency shift isn't a spike forever.
+    Register on_response in response_listeners to feed it.
+    """
+
+    def __init__(
+        self,
+        initial: float = AIMD_INITIAL,
+        minimum: float = 1,
+        maximum: float = DEFAULT_MAX_WORKERS,
+        decrease: float = AIMD_DECREASE,
+        latency_tolerance: float = AIMD_LATENCY_TOLERANCE,
+        cooldown: float = 1.0,
+    ) -> None:
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self.decreases = 0
+        self._baselines: dict[str, float] = {}  # endpoint family -> EWMA latency
+        self._samples: dict[str, int] = {}
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        self._async_waiters: list = []  # (event loop, asyncio.Future) parked in acquire_async()
+
+    def acquire(self) -> None:
+        """Block until one more bounce fits under the current limit"""
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    async def acquire_async(self) -> None:
+        """acquire() for the async engine: waits on the event loop until
+        release() or a limit increase makes room, without blocking it"""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._cond:
+                if self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            await waiter
+
+    def _wake(self) -> None:
+        """Wake every acquire_async() caller to re-check the limit. Called
+        with _cond held, from any thread (task polls report from the waiter's)"""
+        for loop, waiter in self._async_waiters:
+            loop.call_soon_threadsafe(lambda waiter=waiter: waiter.done() or waiter.set_result(None))
+        self._async_waiters.clear()
+
+    def release(self) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+            self._wake()
+
+    def on_response(self, family: str, status: int, seconds: float) -> None:
+        """response_listeners hook: adjust the limit from one controller response"""
+        with self._cond:
+            samples = self._samples[family] = self._samples.get(family, 0) + 1
+            baseline = self._baselines.get(family)
+            spike = (
+                baseline is not None
+                and samples > 10
+                and seconds > baseline * self.latency_tolerance
+            )
+            error = status == 429 or status >= 500
+            if baseline is None:
+                self._baselines[family] = seconds
+            elif not error:
+                # spikes move the baseline too, only slower: a lasting rise in
+                # latency becomes the new normal instead of pinning the limit
+                alpha = AIMD_SPIKE_ALPHA if spike else AIMD_BASELINE_ALPHA
+                self._baselines[family] = baseline + alpha * (seconds - baseline)
+            if error or spike:
+                now = monotonic()
+                if now - self._last_decrease >= self.cooldown:
+                    self._last_decrease = now
+                    self.decreases += 1
+                    self.limit = max(self.minimum, self.limit * self.decrease)
+                return
+            if status < 400:
+                previous = int(self.limit)
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+                if int(self.limit) > previous:
+                    self._cond.notify_all()
+                    self._wake()
+
+class SwitchDispatcher:
+    """Runs bounces on a thread pool switch by switch. A MAC's client lookup
+    runs on the pool, then its port waits in its switch's queue, not on a
+    worker, until one of the switch's switch_writes slots is free. Input
+    grouped by switch so keeps every worker busy instead of parking them on
+    one switch's slot. A MAC on a port that is already being bounced is
+    sent at once and joins that bounce. At most `lookups` lookups are handed
+    to the pool at a time, so a long batch doesn't queue all of its
+    (rate limited) lookups ahead of the first bounce.
+
+    Args:
+        pool (ThreadPoolExecutor): Runs the lookups and the bounces
+        bounce (Callable, optional): Called as bounce(mac_address=..., mode=...). Defaults to port_bounce.
+        mode (str, optional): Option to dry run vs deploy changes. Defaults to "Deploy".
+        lookups (int, optional): Lookups on the pool at once, its worker count. Defaults to DEFAULT_MAX_WORKERS.
+    """
+
+    def __init__(
+        self,
+        pool: ThreadPoolExecutor,
+        bounce: Callable | None = None,
+        mode: str = "Deploy",
+        lookups: int = DEFAULT_MAX_WORKERS,
+    ) -> None:
+        self.pool = pool
+        self.bounce = bounce or port_bounce
+        self.mode = mode
+        self.lookups = lookups
+        self._lock = threading.RLock()  # reentrant, a bounce may finish inside pool.submit()
+        self._unlocated: deque = deque()  # (MAC, result Future) waiting for a lookup
+        self._locating = 0  # lookups handed to the pool
+        self._waiting: dict[str, deque] = {}  # switch UUID -> ports queued for a slot
+        self._running: dict[str, int] = {}  # switch UUID -> ports holding a slot
+        self._queued: dict[str, list] = {}  # port -> (MAC, result Future) waiting with it
+        self._active: dict[str, int] = {}  # port holding a slot -> its bounces not finished
+        self._cancelled = False
+
+    def submit(self, mac_address: str) -> Future:
+        """Queue one MAC address. Returns a Future of its bounce's outcome"""
+        result = Future()
+        with self._lock:
+            self._unlocated.append((mac_address, result))
+            self._locate()
+        return result
+
+    def _locate(self) -> None:
+        """Hand waiting lookups to the pool up to `lookups`. Called with _lock held"""
+        while self._unlocated and self._locating < self.lookups:
+            mac_address, result = self._unlocated.popleft()
+            self._locating += 1
+            lookup = self.pool.submit(self._lookup, mac_address)
+            lookup.add_done_callback(
+                lambda lookup, mac_address=mac_address, result=result: self._located(mac_address, lookup, result)
+            )
+
+    def cancel(self) -> None:
+        """Cancel every MAC not yet being bounced. Bounces already running finish"""
+        with self._lock:
+            if self._cancelled:
+                return
+            self._cancelled = True
+            queued = [result for entries in self._queued.values() for _, result in entries]
+            queued += [result for _, result in self._unlocated]
+            self._unlocated.clear()
+            self._queued.clear()
+            self._waiting.clear()
+        for result in queued:
+            self._drop(result)
+
+    @staticmethod
+    def _drop(result: Future) -> None:
+        result.cancel()
+        result.set_running_or_notify_cancel()  # what wakes concurrent.futures.wait()
+
+    def _lookup(self, mac_address: str) -> tuple[str, str] | None:
+        if self._cancelled:
+            return None
+        return get_client_details(mac_address=mac_address)
+
+    def _located(self, mac_address: str, lookup: Future, result: Future) -> None:
+        with self._lock:
+            self._locating -= 1
+            self._locate()
+        if self._cancelled:
+            self._drop(result)
+            return
         try:
-            r2 = s.put(url=url, json={"adminStatus": "UP"})
-            r2.raise_for_status()
-            if r2.text == "":
-                raise Exception("Empty Response from the server.")
+            interface_name, parent_device_uuid = lookup.result()
+        except Exception as e:
+            counters.inc("bounces_attempted")
+            counters.inc("bounces_failed")
+            result.set_exception(e)
             return
-        except requests.exceptions.HTTPError as e:
-            if "No change in setting" in e.response.text:
-                return
+        port = f"{parent_device_uuid}/{interface_name}"
+        with self._lock:
+            if port in self._active:
+                self._start(mac_address, result, port, parent_device_uuid)
+            elif port in self._queued:
+                self._queued[port].append((mac_address, result))
             else:
-                raise
-    return
+                self._queued[port] = [(mac_address, result)]
+                self._waiting.setdefault(parent_device_uuid, deque()).append(port)
+                self._pump(parent_device_uuid)
 
-def port_bounce(mac_address: str, mode: str = "Deploy") -> None:
-    """Performs a shut no shut operation on a POE device based on MAC address
+    def _pump(self, parent_device_uuid: str) -> None:
+        """Start queued ports while the switch has free slots. Called with _lock held"""
+        waiting = self._waiting.get(parent_device_uuid)
+        while waiting and self._running.get(parent_device_uuid, 0) < switch_writes.value:
+            port = waiting.popleft()
+            self._running[parent_device_uuid] = self._running.get(parent_device_uuid, 0) + 1
+            self._active[port] = 0
+            for mac_address, result in self._queued.pop(port):
+                self._start(mac_address, result, port, parent_device_uuid)
+        if not waiting:
+            self._waiting.pop(parent_device_uuid, None)
+
+    def _start(self, mac_address: str, result: Future, port: str, parent_device_uuid: str) -> None:
+        if self._cancelled:
+            self._drop(result)
+            return
+        self._active[port] += 1
+        bounce = self.pool.submit(self.bounce, mac_address=mac_address, mode=self.mode)
+        bounce.add_done_callback(lambda bounce: self._finished(bounce, result, port, parent_device_uuid))
+
+    def _finished(self, bounce: Future, result: Future, port: str, parent_device_uuid: str) -> None:
+        with self._lock:
+            self._active[port] -= 1
+            if not self._active[port]:
+                del self._active[port]
+                self._running[parent_device_uuid] -= 1
+                if not self._running[parent_device_uuid]:
+                    del self._running[parent_device_uuid]
+                self._pump(parent_device_uuid)
+        error = bounce.exception()
+        if error is None:
+            result.set_result(None)
+        else:
+            result.set_exception(error)
+
+def port_bounce_batch(
+    macs: list[str],
+    mode: str = "Deploy",
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    adaptive: bool = False,
+) -> dict[str, Exception | None]:
+    """Runs port_bounce() for many MAC addresses on a thread pool sharing the
+    module session, handed out switch by switch by a SwitchDispatcher
 
     Args:
-        mac_address (str): MAC address of the device to port bounce
+        macs (list[str]): MAC addresses to port bounce, in any notation
         mode (str, optional): Option to dry run vs deploy changes. Defaults to "Deploy".
+        max_workers (int, optional): Number of bounces in flight. Defaults to DEFAULT_MAX_WORKERS.
+        adaptive (bool, optional): Let an AIMDLimiter find the number in flight,
+        up to max_workers, from controller latency and errors. Defaults to False.
+
+    Returns:
+        dict[str, Exception | None]: Normalized MAC -> None on success, or the
+        exception raised. Invalid values map to an Exception and are not sent
+    """
+    macs, invalid = clean_macs(macs)
+    _size_session_pool(max_workers)
+    bounce = port_bounce
+    if adaptive:
+        limiter = AIMDLimiter(maximum=max_workers)
+        response_listeners.append(limiter.on_response)
+
+        def bounce(mac_address: str, mode: str) -> None:
+            limiter.acquire()
+            try:
+                port_bounce(mac_address=mac_address, mode=mode)
+            finally:
+                limiter.release()
+    try:
+        with profile_stage("port_bounce_batch"), \
+             ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="port_bounce") as pool:
+            dispatcher = SwitchDispatcher(pool, bounce, mode, lookups=max_workers)
+            futures = [(mac_address, dispatcher.submit(mac_address)) for mac_address in macs]
+            # bounces are submitted from callbacks, keep the pool open for them
+            wait([future for _, future in futures])
+    finally:
+        if adaptive:
+            response_listeners.remove(limiter.on_response)
+    return {**{mac_address: future.exception() for mac_address, future in futures}, **invalid}
+
+_MAC_SEPARATORS = str.maketrans("", "", ":-. ")
+_MAC_DIGITS = re.compile(r"[0-9A-F]{12}")
+_MAC_HEADERS = {"mac", "macaddress", "mac_address", "mac address"}
+
+def normalize_mac(value: str) -> str | None:
+    """Canonical AA:BB:CC:DD:EE:FF form of a MAC in any of the usual
+    notations (aa-bb-cc-dd-ee-ff, aabb.ccdd.eeff, aabbccddeeff, ...)
+
+    Returns:
+        str | None: Normalized MAC, or None if `value` is not a MAC address
     """
-    interface_name, parent_device_uuid = get_client_details(
-        mac_address=mac_address
+    digits = value.translate(_MAC_SEPARATORS).upper()
+    if not _MAC_DIGITS.fullmatch(digits):
+        return None
+    return ":".join(digits[i:i + 2] for i in range(0, 12, 2))
+
+NUMPY_MIN_BATCH = 10_000  # below this the plain Python path is as fast
+
+def normalize_macs(values: Iterable[str]) -> tuple[list[str], list[str]]:
+    """Bulk version of normalize_mac(): parse each value into a 48 bit
+    integer, drop invalid entries and duplicates, and render the rest as
+    AA:BB:CC:DD:EE:FF in the order they were first seen.
+
+    Large inputs are parsed and rendered with NumPy array operations when it
+    is installed, which cleans a million rows in a fraction of a second.
+    NumPy is only imported the first time such an input comes along.
+
+    Args:
+        values (Iterable[str]): MAC addresses in any of the usual notations
+
+    Returns:
+        tuple[list[str], list[str]]: Unique normalized MACs, and the invalid raw values
+    """
+    values = list(values)
+    if len(values) >= NUMPY_MIN_BATCH:
+        tables = _numpy_tables()
+        if tables is not None:
+            result = _normalize_macs_numpy(values, *tables)
+            if result is not None:
+                return result
+    macs, invalid, seen = [], [], set()
+    for value in values:
+        digits = value.translate(_MAC_SEPARATORS).upper()
+        if not _MAC_DIGITS.fullmatch(digits):
+            invalid.append(value)
+            continue
+        key = int(digits, 16)
+        if key in seen:
+            continue
+        seen.add(key)
+        macs.append(f"{digits[0:2]}:{digits[2:4]}:{digits[4:6]}:{digits[6:8]}:{digits[8:10]}:{digits[10:12]}")
+    return macs, invalid
+
+def clean_macs(values: Iterable[str]) -> tuple[list[str], dict[str, Exception]]:
+    """normalize_macs() for the bulk entry points, so a batch is cleaned
+    before any API call
+
+    Args:
+        values (Iterable[str]): MAC addresses as given by the caller
+
+    Returns:
+        tuple[list[str], dict[str, Exception]]: Unique normalized MACs to
+        bounce, and an error result for each invalid value
+    """
+    macs, invalid = normalize_macs(values)
+    return macs, {value: Exception(f"Invalid MAC address: {value!r}") for value in invalid}
+
+# (numpy, ASCII byte -> nibble LUT, nibble -> hex digit, hex digit columns of
+# AA:BB:...), filled on first use so the CLI never pays for importing NumPy;
+# False once NumPy turned out not to be installed
+_numpy_loaded = None
+
+def _numpy_tables() -> tuple | None:
+    global _numpy_loaded
+    if _numpy_loaded is None:
+        try:
+            import numpy as np
+        except ImportError:
+            _numpy_loaded = False
+        else:
+            hex_values = np.full(256, 255, dtype=np.uint8)  # 255 if not hex
+            for i, c in enumerate(b"0123456789ABCDEF"):
+                hex_values[c] = i
+                hex_values[ord(chr(c).lower())] = i
+            hex_chars = np.frombuffer(b"0123456789ABCDEF", dtype=np.uint8)
+            columns = np.array([0, 1, 3, 4, 6, 7, 9, 10, 12, 13, 15, 16])
+            _numpy_loaded = (np, hex_values, hex_chars, columns)
+    return _numpy_loaded or None
+
+def _normalize_macs_numpy(
+    values: list[str], np, hex_values, hex_chars, columns
+) -> tuple[list[str], list[str]] | None:
+    """normalize_macs() for big inputs. The values are joined into one byte
+    buffer and everything after that is array ops, no per-value Python work.
+    Returns None if a value contains a newline and the rows can't be split"""
+    blob = "\n".join(values).encode("ascii", "replace")  # non-ASCII -> "?" -> invalid
+    blob = blob.translate(None, b":-. ") + b"\n"
+    data = np.frombuffer(blob, dtype=np.uint8)
+    ends = np.flatnonzero(data == ord("\n"))
+    if len(ends) != len(values):
+        return None
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    rows = np.flatnonzero(ends - starts == 12)
+    windows = np.lib.stride_tricks.sliding_window_view(data, 12)
+    nibbles = np.take(hex_values, windows[starts[rows]])
+    valid = (nibbles != 255).all(axis=1)
+    ok = np.zeros(len(values), dtype=bool)
+    ok[rows[valid]] = True
+    nibbles = nibbles[valid]
+    invalid = list(compress(values, ~ok))
+    if not len(nibbles):
+        return [], invalid
+    octets = np.zeros((len(nibbles), 8), dtype=np.uint8)
+    octets[:, 2:] = (nibbles[:, 0::2] << 4) | nibbles[:, 1::2]
+    keys = octets.view(">u8").ravel()
+    # unique keys keeping the first occurrence of each, without a stable sort
+    order = np.argsort(keys)
+    ordered = keys[order]
+    groups = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+    first = np.minimum.reduceat(order, groups)
+    nibbles = nibbles[np.sort(first)]  # unique, in first-seen order
+    text = np.full((len(nibbles), 18), ord(":"), dtype=np.uint8)
+    text[:, 17] = ord("\n")
+    text[:, columns] = hex_chars[nibbles]
+    macs = text.tobytes().decode("ascii").split("\n")[:-1]
+    return macs, invalid
+
+def read_macs(lines) -> Iterator[tuple[str, str | None]]:
+    """Lazily pull MAC addresses out of plain, CSV (first column) or JSONL
+    ({"mac": ...} / {"macAddress": ...}) lines. Blank lines, # comments and a
+    CSV header row are skipped
+
+    Args:
+        lines: Any iterable of text lines, e.g. an open file or sys.stdin
+
+    Yields:
+        tuple[str, str | None]: Raw value, and its normalized MAC or None if invalid
+    """
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("{"):
+            try:
+                record = json.loads(line)
+                raw = str(record.get("mac") or record.get("macAddress") or "")
+            except (ValueError, AttributeError):
+                raw = line
+        else:
+            raw = line.split(",", 1)[0].strip().strip('"')
+            if raw.lower() in _MAC_HEADERS:
+                continue
+        yield raw, normalize_mac(raw)
+
+def bounce_stream(
+    lines, out, mode: str = "Deploy", max_workers: int = DEFAULT_MAX_WORKERS
+) -> dict[str, int]:
+    """Bounce every MAC read from `lines` and write one JSON result line per
+    input to `out` as each finishes.
+
+    MACs are normalized and deduplicated as they are read and handed to a
+    SwitchDispatcher on max_workers threads. The reader stops while
+    STREAM_READ_AHEAD MACs are unfinished, so memory stays flat however long
+    the input is (apart from one integer per distinct MAC for deduplication),
+    yet input grouped by switch still finds ports on other switches to keep
+    the workers busy. If writing to `out` fails no further bounces are
+    started, the ones in flight finish and the write error is raised.
+
+    Args:
+        lines: Iterable of input lines (file, sys.stdin, list)
+        out: Text stream the JSONL results are written to
+        mode (str, optional): Option to dry run vs deploy changes. Defaults to "Deploy".
+        max_workers (int, optional): Number of bounces in flight. Defaults to DEFAULT_MAX_WORKERS.
+
+    Returns:
+        dict[str, int]: Count of results per status (ok, error, invalid, duplicate)
+    """
+    _size_session_pool(max_workers)
+    read_ahead = max(STREAM_READ_AHEAD, 2 * max_workers)
+    unfinished = threading.BoundedSemaphore(read_ahead)
+    out_lock = threading.Lock()
+    counts = {"ok": 0, "error": 0, "invalid": 0, "duplicate": 0}
+    out_failed = threading.Event()
+    out_errors = []
+
+    def emit(record: dict) -> None:
+        line = json.dumps(record)
+        with out_lock:
+            if out_failed.is_set():
+                return
+            counts[record["status"]] += 1
+            try:
+                out.write(line + "\n")
+                out.flush()
+            except (OSError, ValueError) as e:
+                # e.g. BrokenPipeError from `| head`, stop starting bounces
+                out_errors.append(e)
+                out_failed.set()
+
+    def finished(mac_address: str, start: float, result: Future) -> None:
+        if result.cancelled():
+            unfinished.release()
+            return
+        error = result.exception()
+        if error is None:
+            emit({"mac": mac_address, "status": "ok", "seconds": round(monotonic() - start, 3)})
+        else:
+            emit({
+                "mac": mac_address,
+                "status": "error",
+                "error": str(error),
+                "phase": error.phase if isinstance(error, DeadlineExceeded) else None,
+                "seconds": round(monotonic() - start, 3),
+            })
+        if out_failed.is_set():
+            dispatcher.cancel()  # nobody reads the results, start no more bounces
+        unfinished.release()
+
+    seen: set[int] = set()
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="port_bounce") as pool:
+        dispatcher = SwitchDispatcher(pool, mode=mode, lookups=max_workers)
+        try:
+            for raw, mac_address in read_macs(lines):
+                if out_failed.is_set():
+                    break
+                if mac_address is None:
+                    emit({"mac": raw, "status": "invalid"})
+                    continue
+                key = int(mac_address.replace(":", ""), 16)
+                if key in seen:
+                    emit({"mac": mac_address, "status": "duplicate"})
+                    continue
+                seen.add(key)
+                # waits while the workers are behind, checking for a dead output
+                while not unfinished.acquire(timeout=0.1):
+                    if out_failed.is_set():
+                        break
+                else:
+                    start = monotonic()
+                    dispatcher.submit(mac_address).add_done_callback(
+                        lambda result, mac_address=mac_address, start=start: finished(mac_address, start, result)
+                    )
+        finally:
+            # bounces are submitted from callbacks, keep the pool open for them
+            for _ in range(read_ahead):
+                unfinished.acquire()
+    if out_errors:
+        raise out_errors[0]
+    return counts
+
+def add_run_options(parser: argparse.ArgumentParser) -> None:
+    """Add the options every entry point shares (timeouts, deadline, timings,
+    metrics, trace, profiling) to `parser`, each defaulting from its CCC_*
+    environment variable. ccc_example.py and ccc_async.py both use this, so
+    their command lines can't drift apart
+
+    Args:
+        parser (argparse.ArgumentParser): Parser of the entry point
+    """
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        default=os.getenv("CCC_TIMINGS") == "1",
+        help="Print p50/p95/p99 per phase and endpoint at exit (or on SIGUSR1)",
     )
-    interface_uuid, current_interface_status = get_interface_details(
-        parent_device_uuid=parent_device_uuid,
-        interface_name=interface_name
+    parser.add_argument(
+        "--metrics-file",
+        default=os.getenv("CCC_METRICS_FILE"),
+        help="Keep Prometheus metrics in this file for node-exporter's textfile collector",
     )
-    interface_shut_no_shut(
-        interface_uuid=interface_uuid,
-        current_interface_status=current_interface_status
+    parser.add_argument("--metrics-port", type=int, help="Also serve Prometheus metrics on this local port")
+    parser.add_argument(
+        "--trace",
+        default=os.getenv("CCC_TRACE"),
+        help="Write a Chrome trace-event timeline of the run to this file (open in Perfetto)",
+    )
+    parser.add_argument(
+        "--profile",
+        default=os.getenv("CCC_PROFILE"),
+        help="Profile the run with cprofile or sample (low overhead), written per stage to --profile-dir",
+    )
+    parser.add_argument("--profile-dir", default=os.getenv("CCC_PROFILE_DIR", "profiles"))
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        default=os.getenv("CCC_PROFILE_MEMORY") == "1",
+        help="With --profile, also write a tracemalloc snapshot diff per stage",
+    )
+    parser.add_argument(
+        "--connect-timeout",
+        type=float,
+        default=float(os.getenv("CCC_CONNECT_TIMEOUT", CONNECT_TIMEOUT)),
+        help="Seconds to wait for a controller connection",
+    )
+    parser.add_argument(
+        "--read-timeout",
+        type=float,
+        default=float(os.getenv("CCC_READ_TIMEOUT", READ_TIMEOUT)),
+        help="Seconds to wait for controller response data",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        default=float(os.getenv("CCC_BOUNCE_DEADLINE", BOUNCE_DEADLINE or 0)),
+        help="Seconds one port bounce may take end to end, 0 for no limit",
     )
-    return
+
+def apply_run_options(args: argparse.Namespace) -> None:
+    """Act on the options add_run_options() added: set the timeouts and
+    deadline, and start the reports, exporters and profiler asked for
+
+    Args:
+        args (argparse.Namespace): Parsed command line
+    """
+    global CONNECT_TIMEOUT, READ_TIMEOUT, BOUNCE_DEADLINE, profiler
+    CONNECT_TIMEOUT, READ_TIMEOUT = args.connect_timeout, args.read_timeout
+    BOUNCE_DEADLINE = args.deadline or None
+    if args.timings:
+        enable_latency_report()
+    if args.metrics_file or args.metrics_port is not None:
+        import ccc_metrics
+        ccc_metrics.start(latency, counters, textfile=args.metrics_file, port=args.metrics_port)
+    if args.trace:
+        import ccc_trace
+        ccc_trace.start(latency, args.trace)
+    if args.profile and args.profile != "0":
+        import ccc_profile
+        profiler = ccc_profile.Profiler(
+            mode="cprofile" if args.profile == "1" else args.profile,
+            out_dir=args.profile_dir,
+            memory=args.profile_memory,
+        )
 
 def main() -> None:
     """
     Main entry point of the program. This is just personal convention
     """
-    mac_address = "00:A2:89:AA:AA:AA" # Fake MAC Address for demo
-    port_bounce(mac_address=mac_address)
+    parser = argparse.ArgumentParser(description="Port bounce endpoints by MAC address")
+    parser.add_argument("macs", nargs="*", help="MAC addresses to bounce")
+    parser.add_argument("-i", "--input", help="File of MACs (plain, CSV or JSONL), - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="JSONL results file, - for stdout")
+    parser.add_argument("-w", "--workers", type=int, default=DEFAULT_MAX_WORKERS)
+    parser.add_argument("--mode", default="Deploy", help="deploymentMode sent with interface changes")
+    add_run_options(parser)
+    args = parser.parse_args()
+    apply_run_options(args)
+
+    if not args.macs and not args.input:
+        mac_address = "00:A2:89:AA:AA:AA" # Fake MAC Address for demo
+        with profile_stage("port_bounce"):
+            port_bounce(mac_address=mac_address)
+        return
+    lines = args.macs
+    if args.input == "-":
+        lines = sys.stdin
+    elif args.input:
+        lines = open(args.input, newline="")
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        with profile_stage("bounce_stream"):
+            counts = bounce_stream(lines, out, mode=args.mode, max_workers=args.workers)
+    except BrokenPipeError:
+        if out is not sys.stdout:
+            raise
+        # the reader went away (| head), keep the exit flush from raising again
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+    finally:
+        if lines is not sys.stdin and lines is not args.macs:
+            lines.close()
+        if out is not sys.stdout:
+            out.close()
+    print(json.dumps(counts), file=sys.stderr)
 
 
 if __name__ == "__main__":
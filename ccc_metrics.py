@@ -0,0 +1,182 @@
+"""
+    Prometheus exporter for the bounce metrics ccc_example.py records: bounces
+    attempted/succeeded/failed, controller API calls by endpoint and status
+    code, 429s, token refreshes, and the latency histograms (per bounce phase,
+    which includes task waits, and per HTTP endpoint).
+
+    Metrics are written in the Prometheus text format to a file for
+    node-exporter's textfile collector (replaced atomically, so a scrape never
+    sees half a file) and/or served over HTTP on a local port for long runs.
+    Nothing is computed per API call; the recorders are only read when a file
+    is written or a scrape comes in.
+
+    Usage:
+        python ccc_example.py --input macs.csv --metrics-file /var/lib/node_exporter/textfile/ccc.prom
+        python ccc_example.py --input - --metrics-port 9464
+"""
+
+import atexit
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_INTERVAL = 15.0  # seconds between textfile rewrites
+EXPORT_BUCKETS_EVERY = 4  # export every 4th latency bucket, i.e. 1 ms, 2 ms, 4 ms ...
+
+# counter name in ccc_example.counters -> metric name, help text, label names.
+# Counters without labels are always exported so dashboards see a 0
+COUNTERS = {
+    "bounces_attempted": ("ccc_bounces_attempted_total", "Port bounces started", ()),
+    "bounces_succeeded": ("ccc_bounces_succeeded_total", "Port bounces that completed", ()),
+    "bounces_failed": ("ccc_bounces_failed_total", "Port bounces that raised an error", ()),
+    "api_calls": (
+        "ccc_api_calls_total",
+        "Controller API responses by method, endpoint template and status code",
+        ("method", "endpoint", "code"),
+    ),
+    "rate_limited": ("ccc_rate_limited_total", "429 responses by rate limit family", ("family",)),
+    "token_refreshes": ("ccc_token_refreshes_total", "Auth tokens fetched from the controller", ()),
+}
+HISTOGRAMS = {
+    "phase": ("ccc_phase_seconds", "Duration of port bounce phases, including task waits", ("phase",)),
+    "http": ("ccc_http_request_seconds", "Controller API call latency", ("method", "endpoint")),
+}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_bound(bound: float) -> str:
+    return f"{bound:.6g}"
+
+
+def render(latency, counters) -> str:
+    """Prometheus text format for a ccc_example.LatencyRecorder and Counters
+
+    Args:
+        latency (LatencyRecorder): ccc_example.latency
+        counters (Counters): ccc_example.counters
+
+    Returns:
+        str: Exposition text, ending in a newline
+    """
+    values = counters.snapshot()
+    lines = []
+    for name, (metric, help_text, label_names) in COUNTERS.items():
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} counter")
+        series = sorted((labels, n) for (counter, labels), n in values.items() if counter == name)
+        if not series and not label_names:
+            series = [((), 0)]
+        for labels, n in series:
+            lines.append(f"{metric}{_labels(label_names, labels)} {n}")
+
+    with latency.lock:
+        histograms = [
+            (kind, name, list(h.counts), h.count, h.sum, h.bounds)
+            for (kind, name), h in sorted(latency.histograms.items())
+        ]
+    for kind, (metric, help_text, label_names) in HISTOGRAMS.items():
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} histogram")
+        for h_kind, name, counts, count, total, bounds in histograms:
+            if h_kind != kind:
+                continue
+            label_values = tuple(name.split(" ", 1)) if kind == "http" else (name,)
+            cumulative = 0
+            for i, n in enumerate(counts[:len(bounds)]):
+                cumulative += n
+                if i % EXPORT_BUCKETS_EVERY == 0:
+                    le = f'le="{_format_bound(bounds[i])}"'
+                    lines.append(f"{metric}_bucket{_labels(label_names, label_values, le)} {cumulative}")
+            inf = 'le="+Inf"'
+            lines.append(f"{metric}_bucket{_labels(label_names, label_values, inf)} {count}")
+            lines.append(f"{metric}_sum{_labels(label_names, label_values)} {total:.6f}")
+            lines.append(f"{metric}_count{_labels(label_names, label_values)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(path: str, latency, counters) -> None:
+    """Write render() to `path` through a temp file in the same directory and
+    a rename, so the textfile collector only ever reads a complete file"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(render(latency, counters))
+        os.chmod(tmp_path, 0o644)  # mkstemp files are 0600, node-exporter runs as another user
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def serve(latency, counters, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve render() at /metrics from a background thread
+
+    Returns:
+        ThreadingHTTPServer: The running server, call shutdown() to stop it
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = render(latency, counters).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:
+            pass  # scrapes would flood the console
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics_http", daemon=True).start()
+    return server
+
+
+def start(
+    latency,
+    counters,
+    textfile: str | None = None,
+    port: int | None = None,
+    interval: float = DEFAULT_INTERVAL,
+) -> None:
+    """Export for the rest of the run: rewrite `textfile` every `interval`
+    seconds and once more at exit, and/or serve on `port`
+
+    Args:
+        latency (LatencyRecorder): ccc_example.latency
+        counters (Counters): ccc_example.counters
+        textfile (str | None, optional): .prom file to keep up to date. Defaults to None.
+        port (int | None, optional): Local port to serve /metrics on. Defaults to None.
+        interval (float, optional): Seconds between textfile rewrites. Defaults to DEFAULT_INTERVAL.
+    """
+    if textfile:
+        stop = threading.Event()
+
+        def loop() -> None:
+            while not stop.wait(interval):
+                write_textfile(textfile, latency, counters)
+
+        def final() -> None:
+            stop.set()
+            write_textfile(textfile, latency, counters)
+
+        threading.Thread(target=loop, name="metrics_textfile", daemon=True).start()
+        atexit.register(final)
+    if port is not None:
+        serve(latency, counters, port)
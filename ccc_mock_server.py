@@ -0,0 +1,378 @@
+"""
+    Local stand-in for the handful of Catalyst Center endpoints used by
+    ccc_example.py, so the port bounce workflow can be run and benchmarked
+    without a controller.
+
+    Every MAC address maps to a stable fake switch/port, interface PUTs create
+    tasks that stay PENDING for a configurable time, and latency, failures,
+    401s (token expiry) and 429 responses can be injected from the command line.
+
+    Usage:
+        python ccc_mock_server.py --port 8443 --latency 0.05 --task-duration 2
+        CCC_URL=http://127.0.0.1:8443 CCC_UN=x CCC_PW=x python ccc_example.py
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+PORTS_PER_SWITCH = 48
+LISTEN_BACKLOG = 256  # queued connections; the default of 5 overflows at benchmark concurrency
+
+CLIENT_DETAIL = re.compile(r"^/dna/intent/api/v1/client-detail$")
+INTERFACE_NAME = re.compile(r"^/dna/intent/api/v1/interface/network-device/([^/]+)/interface-name$")
+DEVICE_INTERFACES = re.compile(r"^/dna/intent/api/v1/interface/network-device/([^/]+)$")
+INTERFACE = re.compile(r"^/dna/intent/api/v1/interface/([^/]+)$")
+TASK = re.compile(r"^/dna/intent/api/v1/tasks/([^/]+)$")
+AUTH = "/dna/system/api/v1/auth/token"
+
+
+class MockController:
+    """In-memory controller state shared by all request handler threads"""
+
+    def __init__(
+        self,
+        switches: int = 50,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        task_duration: float = 1.0,
+        failure_rate: float = 0.0,
+        task_failure_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        rate_limit: float = 0.0,
+        retry_after: float = 1.0,
+        token_ttl: float = 3600.0,
+    ) -> None:
+        self.switches = switches
+        self.latency = latency
+        self.jitter = jitter
+        self.task_duration = task_duration
+        self.failure_rate = failure_rate
+        self.task_failure_rate = task_failure_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.token_ttl = token_ttl
+        self.lock = threading.Lock()
+        self.tokens: dict[str, float] = {}
+        self.admin_status: dict[str, str] = {}
+        self.tasks: dict[str, dict] = {}
+        self.pending: list[dict] = []
+        self.calls: dict[str, int] = {}
+        self.windows: dict[str, tuple[int, int]] = {}  # endpoint -> (second, count)
+
+    def count(self, name: str) -> None:
+        """Tally one request per endpoint family (and 401/429/5xx answers)"""
+        with self.lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+    def over_limit(self, name: str) -> float | None:
+        """Fixed one second window per endpoint family. Returns the seconds
+        until the window resets when `name` is over rate_limit, else None"""
+        if not self.rate_limit:
+            return None
+        now = time.monotonic()
+        second = int(now)
+        with self.lock:
+            window, count = self.windows.get(name, (second, 0))
+            if window != second:
+                window, count = second, 0
+            self.windows[name] = (window, count + 1)
+        if count + 1 > self.rate_limit:
+            return second + 1 - now
+        return None
+
+    def issue_token(self) -> str:
+        token = uuid.uuid4().hex
+        with self.lock:
+            self.tokens[token] = time.monotonic() + self.token_ttl
+        return token
+
+    def token_valid(self, token: str | None) -> bool:
+        with self.lock:
+            expires = self.tokens.get(token or "")
+        return expires is not None and expires > time.monotonic()
+
+    def locate(self, mac_address: str) -> tuple[str, str]:
+        """Stable MAC -> (switch UUID, interface name) mapping. Different MACs
+        can land on the same port, like a phone and PC sharing one"""
+        digest = int(hashlib.sha1(mac_address.upper().encode()).hexdigest(), 16)
+        switch = digest % self.switches
+        port = (digest // self.switches) % PORTS_PER_SWITCH + 1
+        return self.switch_uuid(switch), f"GigabitEthernet1/0/{port}"
+
+    def switch_uuid(self, switch: int) -> str:
+        return str(uuid.UUID(int=switch + 1))
+
+    def interface_uuid(self, switch_uuid: str, interface_name: str) -> str:
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{switch_uuid}/{interface_name}"))
+
+    def settle(self) -> None:
+        """Apply the admin status of every task that has finished. Caller holds lock"""
+        now = time.monotonic()
+        still_pending = []
+        for task in self.pending:
+            if task["done_at"] > now:
+                still_pending.append(task)
+            elif not task["failed"]:
+                self.admin_status[task["interface"]] = task["adminStatus"]
+        self.pending = still_pending
+
+    def current_status(self, interface_uuid: str) -> str:
+        with self.lock:
+            self.settle()
+            return self.admin_status.get(interface_uuid, "UP")
+
+    def interfaces(self, switch_uuid: str) -> list[dict]:
+        with self.lock:
+            self.settle()
+        result = []
+        for port in range(1, PORTS_PER_SWITCH + 1):
+            name = f"GigabitEthernet1/0/{port}"
+            if_uuid = self.interface_uuid(switch_uuid, name)
+            with self.lock:
+                status = self.admin_status.get(if_uuid, "UP")
+            result.append({
+                "id": if_uuid,
+                "portName": name,
+                "adminStatus": status,
+                "deviceId": switch_uuid,
+            })
+        return result
+
+    def create_task(self, interface_uuid: str, admin_status: str) -> str:
+        task_id = uuid.uuid4().hex
+        failed = random.random() < self.task_failure_rate
+        task = {
+            "done_at": time.monotonic() + self.task_duration,
+            "interface": interface_uuid,
+            "adminStatus": admin_status,
+            "failed": failed,
+        }
+        with self.lock:
+            self.tasks[task_id] = task
+            self.pending.append(task)
+        return task_id
+
+    def task_status(self, task_id: str) -> dict | None:
+        with self.lock:
+            task = self.tasks.get(task_id)
+            if task is None:
+                return None
+            if time.monotonic() < task["done_at"]:
+                return {"id": task_id, "status": "PENDING"}
+            self.settle()
+            if task["failed"]:
+                return {"id": task_id, "status": "FAILURE"}
+            return {"id": task_id, "status": "SUCCESS"}
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Routes the Catalyst Center paths used by ccc_example.py onto MockController"""
+
+    protocol_version = "HTTP/1.1"
+    # buffer each response into one write, separate header/body segments
+    # trip Nagle + delayed ACK and add ~40ms to every keep-alive request
+    wbufsize = -1
+    disable_nagle_algorithm = True
+    controller: MockController
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def _send(self, status: int, body: dict | str, headers: dict | None = None) -> None:
+        data = body if isinstance(body, str) else json.dumps(body)
+        payload = data.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_body(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length))
+
+    def _preamble(self, name: str) -> bool:
+        """Latency, fault and auth injection. Returns False if a response was sent"""
+        c = self.controller
+        c.count(name)
+        delay = c.latency + random.uniform(0, c.jitter)
+        if delay:
+            time.sleep(delay)
+        retry_after = c.over_limit(name)
+        if retry_after is None and c.rate_limit_rate and random.random() < c.rate_limit_rate:
+            retry_after = c.retry_after
+        if retry_after is not None:
+            c.count("429")
+            self._send(429, {"error": "Too Many Requests"}, {"Retry-After": f"{retry_after:.3g}"})
+            return False
+        if c.failure_rate and random.random() < c.failure_rate:
+            c.count("5xx")
+            self._send(503, {"error": "Service Unavailable"})
+            return False
+        if name != "auth" and not c.token_valid(self.headers.get("X-Auth-Token")):
+            c.count("401")
+            self._send(401, {"error": "Unauthorized"})
+            return False
+        return True
+
+    def do_POST(self) -> None:
+        self._read_body()
+        path = urlparse(self.path).path
+        if path != AUTH:
+            return self._send(404, {"error": "Not Found"})
+        if not self._preamble("auth"):
+            return
+        self._send(200, {"Token": self.controller.issue_token()})
+
+    def do_GET(self) -> None:
+        c = self.controller
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        path = parsed.path
+        if CLIENT_DETAIL.match(path):
+            if not self._preamble("client-detail"):
+                return
+            mac_address = query.get("macAddress", [""])[0]
+            switch_uuid, interface_name = c.locate(mac_address)
+            return self._send(200, {
+                "detail": {
+                    "hostMac": mac_address,
+                    "port": interface_name,
+                    "connectedDevice": [{"id": switch_uuid}],
+                },
+                "topology": {"nodes": [{"id": mac_address}, {"id": switch_uuid}]},
+            })
+        m = INTERFACE_NAME.match(path)
+        if m:
+            if not self._preamble("interface-name"):
+                return
+            name = query.get("name", [""])[0]
+            for interface in c.interfaces(m.group(1)):
+                if interface["portName"] == name:
+                    return self._send(200, {"response": interface})
+            return self._send(404, {"response": {}})
+        m = DEVICE_INTERFACES.match(path)
+        if m:
+            if not self._preamble("device-interfaces"):
+                return
+            return self._send(200, {"response": c.interfaces(m.group(1))})
+        m = TASK.match(path)
+        if m:
+            if not self._preamble("tasks"):
+                return
+            status = c.task_status(m.group(1))
+            if status is None:
+                return self._send(404, {"response": {}})
+            return self._send(200, {"response": status})
+        self._send(404, {"error": "Not Found"})
+
+    def do_PUT(self) -> None:
+        c = self.controller
+        body = self._read_body()
+        path = urlparse(self.path).path
+        m = INTERFACE.match(path)
+        if not m:
+            return self._send(404, {"error": "Not Found"})
+        if not self._preamble("interface-put"):
+            return
+        interface_uuid = m.group(1)
+        admin_status = body.get("adminStatus")
+        current = c.current_status(interface_uuid)
+        if admin_status == current:
+            return self._send(400, {"response": {"message": "No change in setting"}})
+        task_id = c.create_task(interface_uuid, admin_status)
+        self._send(202, {"response": {"taskId": task_id, "url": f"/api/v1/task/{task_id}"}})
+
+
+class MockHTTPServer(ThreadingHTTPServer):
+    # with the socketserver default, connections beyond 5 waiting for accept()
+    # are dropped and only get in on a SYN retransmit, adding ~1s tails
+    request_queue_size = LISTEN_BACKLOG
+    daemon_threads = True
+
+
+def make_server(controller: MockController, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Bind a threaded HTTP server answering for `controller`
+
+    Args:
+        controller (MockController): Shared controller state
+        host (str, optional): Bind address. Defaults to "127.0.0.1".
+        port (int, optional): Bind port, 0 picks a free one. Defaults to 0.
+
+    Returns:
+        ThreadingHTTPServer: Bound server, use server.server_address for the port
+    """
+    handler = type("BoundHandler", (Handler,), {"controller": controller})
+    return MockHTTPServer((host, port), handler)
+
+
+def serve(controller: MockController, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Start the mock server on a background thread, for benchmarks and tests
+
+    Args:
+        controller (MockController): Shared controller state
+        host (str, optional): Bind address. Defaults to "127.0.0.1".
+        port (int, optional): Bind port, 0 picks a free one. Defaults to 0.
+
+    Returns:
+        ThreadingHTTPServer: Running server, call shutdown() when done
+    """
+    server = make_server(controller, host, port)
+    threading.Thread(target=server.serve_forever, name="mock_ccc", daemon=True).start()
+    return server
+
+
+def main() -> None:
+    """
+    Main entry point of the program. This is just personal convention
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8443)
+    parser.add_argument("--switches", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency up to this many seconds")
+    parser.add_argument("--task-duration", type=float, default=1.0, help="Seconds a task stays PENDING")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--task-failure-rate", type=float, default=0.0, help="Fraction of tasks that end in FAILURE")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Requests per second per endpoint before 429s")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--token-ttl", type=float, default=3600.0, help="Seconds before issued tokens expire")
+    args = parser.parse_args()
+    controller = MockController(
+        switches=args.switches,
+        latency=args.latency,
+        jitter=args.jitter,
+        task_duration=args.task_duration,
+        failure_rate=args.failure_rate,
+        task_failure_rate=args.task_failure_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        rate_limit=args.rate_limit,
+        retry_after=args.retry_after,
+        token_ttl=args.token_ttl,
+    )
+    server = make_server(controller, args.host, args.port)
+    print(f"Mock Catalyst Center listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(json.dumps(controller.calls, indent=2))
+
+
+if __name__ == "__main__":
+    main()
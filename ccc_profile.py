@@ -0,0 +1,212 @@
+"""
+    Opt-in profiling of ccc_example.py runs, so CPU hot spots (JSON parsing,
+    URL building, locking) and memory growth can be found on a production
+    host without editing the script.
+
+    Each profiled stage writes its own files to the profile directory:
+
+      - cprofile mode: <stage>.<pid>.prof (pstats, open with snakeviz or
+        python -m pstats) and <stage>.<pid>.txt with the top functions. Needs
+        Python 3.12+, where one profiler sees every thread; older versions
+        (or another profiling tool already active) fall back to sample mode
+      - sample mode: a low overhead sampling profiler that looks at every
+        thread's stack each SAMPLE_INTERVAL seconds and writes
+        <stage>.<pid>.folded (input for flamegraph.pl / speedscope) and
+        <stage>.<pid>.txt with the top functions by self and total samples
+      - with memory on, <stage>.<pid>.memory.txt: the tracemalloc snapshot
+        diff between the start and end of the stage, by source line
+
+    Usage:
+        python ccc_example.py --input macs.csv --profile cprofile --profile-memory
+        CCC_PROFILE=sample CCC_PROFILE_DIR=/tmp/ccc-profiles python ccc_example.py --input macs.csv
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+
+MODES = ("cprofile", "sample")
+DEFAULT_DIR = "profiles"
+SAMPLE_INTERVAL = 0.005  # seconds between stack samples in sample mode
+TOP_FUNCTIONS = 30  # rows in the .txt summaries
+TOP_ALLOCATIONS = 25  # rows in the tracemalloc diff
+TRACEMALLOC_FRAMES = 1  # frames kept per allocation, more is slower
+
+
+class Profiler:
+    """Profiles named stages of a run. Stages don't nest: a stage entered
+    while another is active is covered by the outer one
+
+    Args:
+        mode (str, optional): "cprofile" or "sample". Defaults to "cprofile".
+        out_dir (str, optional): Directory the profiles are written to. Defaults to DEFAULT_DIR.
+        memory (bool, optional): Also diff tracemalloc snapshots per stage. Defaults to False.
+        interval (float, optional): Seconds between samples in sample mode. Defaults to SAMPLE_INTERVAL.
+    """
+
+    def __init__(
+        self,
+        mode: str = "cprofile",
+        out_dir: str = DEFAULT_DIR,
+        memory: bool = False,
+        interval: float = SAMPLE_INTERVAL,
+    ) -> None:
+        if mode not in MODES:
+            raise ValueError(f"Unknown profile mode {mode}, expected one of {', '.join(MODES)}")
+        if mode == "cprofile" and sys.version_info < (3, 12):
+            # before 3.12 cProfile only sees the thread that enabled it
+            print("profile: cprofile mode needs Python 3.12+ to see worker threads, sampling instead", file=sys.stderr)
+            mode = "sample"
+        self.mode = mode
+        self.out_dir = out_dir
+        self.memory = memory
+        self.interval = interval
+        self._active = False
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Profile the body of a with block as stage `name`"""
+        with self._lock:
+            nested = self._active
+            self._active = True
+        if nested:
+            yield
+            return
+        os.makedirs(self.out_dir, exist_ok=True)
+        base = os.path.join(self.out_dir, f"{name}.{os.getpid()}")
+        memory = self._start_memory() if self.memory else None
+        stop = None
+        if self.mode == "cprofile":
+            try:
+                stop = self._start_cprofile()
+            except ValueError as e:
+                # "Another profiling tool is already active", e.g. a debugger
+                print(f"profile: {e}, sampling stage {name} instead", file=sys.stderr)
+        if stop is None:
+            stop = self._start_sampling()
+        try:
+            yield
+        finally:
+            # collect everything before writing any of it, so the writing
+            # shows up in neither the profile nor the memory diff
+            if memory is not None:
+                write_memory = self._stop_memory(*memory)
+            write = stop()
+            write(base)
+            if memory is not None:
+                write_memory(base)
+            with self._lock:
+                self._active = False
+
+    def _start_cprofile(self):
+        """Start cProfile for every thread, those already running included.
+        Returns a function that stops it and returns the writer"""
+        profile = cProfile.Profile()
+        profile.enable()
+
+        def stop():
+            profile.disable()
+            stats = pstats.Stats(profile)
+
+            def write(base: str) -> None:
+                stats.dump_stats(f"{base}.prof")
+                text = io.StringIO()
+                stats.stream = text
+                stats.sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+                stats.sort_stats("tottime").print_stats(TOP_FUNCTIONS)
+                with open(f"{base}.txt", "w") as f:
+                    f.write(text.getvalue())
+                print(f"profile: wrote {base}.prof and {base}.txt", file=sys.stderr)
+            return write
+
+        return stop
+
+    def _start_sampling(self):
+        """Start sampling every thread's stack. Samples are wall clock, so
+        threads blocked in sleep or I/O count too. Returns a function that
+        stops sampling and returns the writer"""
+        stacks: Counter = Counter()
+        done = threading.Event()
+        samples = 0
+
+        def sample() -> None:
+            nonlocal samples
+            me = threading.get_ident()
+            while not done.wait(self.interval):
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == me:
+                        continue
+                    stack = []
+                    while frame is not None:
+                        code = frame.f_code
+                        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                        frame = frame.f_back
+                    stack.append(names.get(thread_id, str(thread_id)))
+                    stacks[tuple(reversed(stack))] += 1
+                samples += 1
+
+        sampler = threading.Thread(target=sample, name="profile_sampler", daemon=True)
+        sampler.start()
+        start = time.monotonic()
+
+        def stop():
+            done.set()
+            sampler.join()
+            elapsed = time.monotonic() - start
+
+            def write(base: str) -> None:
+                with open(f"{base}.folded", "w") as f:
+                    for stack, count in stacks.most_common():
+                        f.write(f"{';'.join(stack)} {count}\n")
+                own, total = Counter(), Counter()
+                for stack, count in stacks.items():
+                    own[stack[-1]] += count
+                    for function in set(stack[1:]):
+                        total[function] += count
+                with open(f"{base}.txt", "w") as f:
+                    f.write(f"{samples} samples over {elapsed:.1f}s, every {self.interval * 1000:g} ms, all threads\n")
+                    for title, counts in (("self", own), ("total", total)):
+                        f.write(f"\ntop functions by {title} samples:\n")
+                        for function, count in counts.most_common(TOP_FUNCTIONS):
+                            f.write(f"{count:10d}  {function}\n")
+                print(f"profile: wrote {base}.folded and {base}.txt", file=sys.stderr)
+            return write
+
+        return stop
+
+    def _start_memory(self) -> tuple[tracemalloc.Snapshot, bool]:
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        return tracemalloc.take_snapshot(), started
+
+    def _stop_memory(self, before: tracemalloc.Snapshot, started: bool):
+        after = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if started:
+            tracemalloc.stop()
+
+        # leave out the profiler's own bookkeeping
+        ignore = [tracemalloc.Filter(False, module.__file__) for module in (cProfile, pstats, tracemalloc)]
+        ignore.append(tracemalloc.Filter(False, __file__))
+        before, after = before.filter_traces(ignore), after.filter_traces(ignore)
+
+        def write(base: str) -> None:
+            path = f"{base}.memory.txt"
+            with open(path, "w") as f:
+                f.write(f"traced now {current / 1e6:.1f} MB, peak {peak / 1e6:.1f} MB\n")
+                f.write(f"\ntop {TOP_ALLOCATIONS} allocation changes by line:\n")
+                for diff in after.compare_to(before, "lineno")[:TOP_ALLOCATIONS]:
+                    f.write(f"{diff}\n")
+            print(f"profile: wrote {path}", file=sys.stderr)
+        return write
+
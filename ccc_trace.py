@@ -0,0 +1,140 @@
+"""
+    Chrome trace-event export of a run, for looking at concurrency in
+    Perfetto (https://ui.perfetto.dev) or chrome://tracing.
+
+    The Tracer listens to ccc_example.latency, so it sees every port_bounce()
+    and its phases, every controller call (with its status) and every task
+    wait, without extra instrumentation in the workflow code:
+
+      - bounces, phases and HTTP calls are spans on the track of the thread
+        (or asyncio task) that ran them
+      - task waits are async spans named after the task, tagged with the
+        MAC whose bounce submitted it
+      - 429 responses are instant markers
+      - counter tracks show bounces, HTTP calls, task waits and rate limit
+        waits in flight over time, which makes pool saturation and 429
+        backoff stalls easy to spot
+
+    Usage:
+        python ccc_example.py --input macs.csv --trace run.json
+        CCC_TRACE=run.json python ccc_async.py
+"""
+
+import asyncio
+import atexit
+import json
+import threading
+from time import monotonic
+
+# counter track -> predicate on (kind, name) picking the spans it counts
+COUNTER_TRACKS = {
+    "bounces in flight": lambda kind, name: kind == "phase" and name == "port_bounce",
+    "http calls in flight": lambda kind, name: kind == "http",
+    "task waits in flight": lambda kind, name: kind == "phase" and name.startswith("task_wait"),
+    "rate limit waits": lambda kind, name: kind == "phase" and name.startswith("rate_limit_wait"),
+}
+
+
+def _track() -> tuple[int, str]:
+    """ID and name of the track for the caller: its asyncio task if it runs
+    on an event loop, otherwise its thread"""
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    if task is not None:
+        return id(task), task.get_name()
+    thread = threading.current_thread()
+    return thread.ident, thread.name
+
+
+class Tracer:
+    """Collects spans from a ccc_example.LatencyRecorder and writes them as
+    Chrome trace-event JSON. Recording is an append per span; all of the
+    conversion happens in write()
+    """
+
+    def __init__(self) -> None:
+        self.origin = monotonic()
+        self.spans: list[tuple] = []
+        self.tracks: dict[int, str] = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, kind: str, name: str, seconds: float, detail: dict) -> None:
+        end = monotonic()
+        track, track_name = _track()
+        with self.lock:
+            self.spans.append((kind, name, end - seconds, seconds, track, detail))
+            self.tracks.setdefault(track, track_name)
+
+    def install(self, latency) -> "Tracer":
+        latency.listeners.append(self)
+        return self
+
+    def uninstall(self, latency) -> None:
+        latency.listeners.remove(self)
+
+    def _us(self, t: float) -> float:
+        return round((t - self.origin) * 1_000_000, 1)
+
+    def events(self) -> list[dict]:
+        """Spans, markers and counter samples in trace-event form"""
+        with self.lock:
+            spans = list(self.spans)
+            tracks = dict(self.tracks)
+        events = [
+            {"ph": "M", "pid": 1, "tid": 0, "name": "process_name", "args": {"name": "ccc_example"}},
+        ]
+        for track, track_name in tracks.items():
+            events.append({"ph": "M", "pid": 1, "tid": track, "name": "thread_name", "args": {"name": track_name}})
+        changes: dict[str, list[tuple[float, int]]] = {counter: [] for counter in COUNTER_TRACKS}
+
+        for kind, name, start, seconds, track, detail in spans:
+            args = {key: value for key, value in detail.items() if value is not None}
+            if "task_id" in detail:
+                # task waits overlap freely (wave mode submits many at once), so
+                # they go on async tracks instead of the thread that finished them
+                task = {"cat": "task", "name": name, "id": detail["task_id"], "pid": 1, "tid": track}
+                events.append({**task, "ph": "b", "ts": self._us(start), "args": args})
+                events.append({**task, "ph": "e", "ts": self._us(start + seconds)})
+            else:
+                events.append({
+                    "ph": "X",
+                    "cat": kind,
+                    "name": name,
+                    "ts": self._us(start),
+                    "dur": round(seconds * 1_000_000, 1),
+                    "pid": 1,
+                    "tid": track,
+                    "args": args,
+                })
+            if kind == "http" and detail.get("status") == 429:
+                events.append({
+                    "ph": "i", "s": "p", "cat": "http", "name": "429", "pid": 1, "tid": track,
+                    "ts": self._us(start + seconds), "args": {"endpoint": name},
+                })
+            for counter, matches in COUNTER_TRACKS.items():
+                if matches(kind, name):
+                    changes[counter].append((start, 1))
+                    changes[counter].append((start + seconds, -1))
+
+        for counter, points in changes.items():
+            in_flight = 0
+            for t, step in sorted(points):
+                in_flight += step
+                events.append({
+                    "ph": "C", "pid": 1, "tid": 0, "name": counter, "ts": self._us(t), "args": {"value": in_flight},
+                })
+        return events
+
+    def write(self, path: str) -> None:
+        """Write the trace as {"traceEvents": [...]}, loadable in Perfetto"""
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.events(), "displayTimeUnit": "ms"}, f)
+
+
+def start(latency, path: str) -> Tracer:
+    """Trace the rest of the run and write it to `path` at exit"""
+    tracer = Tracer().install(latency)
+    atexit.register(tracer.write, path)
+    return tracer
@@ -0,0 +1,42 @@
+import os
+import sys
+
+import pytest
+
+# the examples are top level scripts, not a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ccc_example  # noqa: E402
+import ccc_mock_server  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def controller(request):
+    """Mock controller for the module, tasks take its TASK_DURATION seconds"""
+    controller = ccc_mock_server.MockController(
+        task_duration=getattr(request.module, "TASK_DURATION", 0.1), latency=0.01
+    )
+    server = ccc_mock_server.serve(controller)
+    patch = pytest.MonkeyPatch()
+    # straight into the module dict, getattr would load the real config
+    settings = vars(ccc_example)
+    patch.setitem(settings, "CCC_URL", f"http://127.0.0.1:{server.server_address[1]}")
+    patch.setitem(settings, "CCC_UN", "demo")
+    patch.setitem(settings, "CCC_PW", "demo")
+    yield controller
+    patch.undo()
+    server.shutdown()
+
+
+@pytest.fixture
+def admin_status(controller):
+    """Current admin status of the port a MAC address is seen on"""
+
+    def admin_status(mac_address: str) -> str:
+        interface_name, parent_device_uuid = ccc_example.get_client_details(mac_address=mac_address)
+        ccc_example.forget_interface(parent_device_uuid, interface_name)
+        return ccc_example.get_interface_details(
+            parent_device_uuid=parent_device_uuid, interface_name=interface_name
+        )[1]
+
+    return admin_status
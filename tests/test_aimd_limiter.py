@@ -0,0 +1,73 @@
+import asyncio
+import threading
+
+from ccc_example import AIMDLimiter
+
+
+def test_steady_mix_of_families_is_not_a_spike():
+    limiter = AIMDLimiter(initial=4, maximum=50, cooldown=0)
+    for _ in range(200):
+        limiter.on_response("tasks", 200, 0.010)
+        limiter.on_response("client-detail", 200, 0.040)
+        limiter.on_response("interface", 202, 0.060)
+    assert limiter.decreases == 0
+    assert limiter.limit > 4
+
+
+def test_latency_spike_in_one_family_cuts_the_limit():
+    limiter = AIMDLimiter(initial=8, maximum=50, cooldown=0)
+    for _ in range(20):
+        limiter.on_response("tasks", 200, 0.010)
+        limiter.on_response("interface", 202, 0.060)
+    before = limiter.limit
+    limiter.on_response("tasks", 200, 0.050)
+    assert limiter.decreases == 1
+    assert limiter.limit < before
+
+
+def test_429_cuts_the_limit():
+    limiter = AIMDLimiter(initial=8, cooldown=0)
+    limiter.on_response("tasks", 429, 0.010)
+    assert limiter.limit == 4
+
+
+def test_acquire_async_wakes_on_release_from_another_thread():
+    limiter = AIMDLimiter(initial=1, minimum=1, maximum=1)
+
+    async def run() -> None:
+        await limiter.acquire_async()
+        second = asyncio.ensure_future(limiter.acquire_async())
+        await asyncio.sleep(0.05)
+        assert not second.done()
+        threading.Timer(0.01, limiter.release).start()
+        await asyncio.wait_for(second, 1)
+        assert limiter.in_flight == 1
+
+    asyncio.run(run())
+
+
+def test_acquire_async_wakes_on_limit_increase():
+    limiter = AIMDLimiter(initial=1, minimum=1, maximum=2)
+
+    async def run() -> None:
+        await limiter.acquire_async()
+        second = asyncio.ensure_future(limiter.acquire_async())
+        await asyncio.sleep(0.01)
+        assert not second.done()
+        limiter.on_response("tasks", 200, 0.010)  # 1 -> 2
+        await asyncio.wait_for(second, 1)
+        assert limiter.in_flight == 2
+
+    asyncio.run(run())
+
+
+def test_lasting_latency_shift_becomes_the_baseline():
+    limiter = AIMDLimiter(initial=8, maximum=50, cooldown=0)
+    for _ in range(50):
+        limiter.on_response("tasks", 200, 0.010)
+    for _ in range(300):
+        limiter.on_response("tasks", 200, 0.025)
+    assert 0.02 < limiter._baselines["tasks"] <= 0.025
+    # the shift cut the limit for a while, then growth resumed
+    assert 0 < limiter.decreases < 50
+    assert limiter.limit > limiter.minimum + 5
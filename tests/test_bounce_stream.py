@@ -0,0 +1,43 @@
+import io
+import threading
+
+import ccc_example
+
+
+class BrokenPipe(io.StringIO):
+    """Output whose reader has gone away, as with `| head -1`"""
+
+    def write(self, text: str) -> int:
+        raise BrokenPipeError(32, "Broken pipe")
+
+
+def test_bounces_every_mac_once(controller, monkeypatch):
+    bounced = []
+    monkeypatch.setattr(ccc_example, "port_bounce", lambda mac_address, mode: bounced.append(mac_address))
+    out = io.StringIO()
+    counts = ccc_example.bounce_stream(
+        ["00a2.89aa.0001", "00:A2:89:AA:00:01", "nope", "00:A2:89:AA:00:02"], out, max_workers=2
+    )
+    assert counts == {"ok": 2, "error": 0, "invalid": 1, "duplicate": 1}
+    assert sorted(bounced) == ["00:A2:89:AA:00:01", "00:A2:89:AA:00:02"]
+    assert len(out.getvalue().splitlines()) == 4
+
+
+def test_output_error_stops_the_stream(controller, monkeypatch):
+    bounced = []
+    monkeypatch.setattr(ccc_example, "port_bounce", lambda mac_address, mode: bounced.append(mac_address))
+    lines = [f"00:A2:89:AB:{i // 256:02X}:{i % 256:02X}" for i in range(1000)]
+    errors = []
+
+    def run() -> None:
+        try:
+            ccc_example.bounce_stream(lines, BrokenPipe(), max_workers=2)
+        except BrokenPipeError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(10)
+    assert not thread.is_alive(), "bounce_stream hung after its output failed"
+    assert len(errors) == 1
+    assert len(bounced) < len(lines)
@@ -0,0 +1,44 @@
+import asyncio
+import time
+
+import pytest
+
+import ccc_example
+from ccc_example import DeadlineExceeded
+
+TASK_DURATION = 1.5  # interface tasks outlast the 1s bounce deadline
+
+
+@pytest.fixture
+def deadline(monkeypatch):
+    monkeypatch.setattr(ccc_example, "BOUNCE_DEADLINE", 1)
+
+
+def test_sync_deadline_reports_phase_and_restores_port(controller, deadline, admin_status):
+    mac_address = "00:A2:89:AA:DD:01"
+    with pytest.raises(DeadlineExceeded) as e:
+        ccc_example.port_bounce(mac_address)
+    assert e.value.phase == "task_wait adminStatus=DOWN"
+    time.sleep(2)  # let every task the bounce left behind land
+    assert admin_status(mac_address) == "UP"
+    assert not ccc_example.task_waiter._pending
+
+
+def test_async_deadline_reports_phase_and_restores_port(controller, deadline, admin_status):
+    ccc_async = pytest.importorskip("ccc_async")
+    mac_address = "00:A2:89:AA:DD:02"
+    results = asyncio.run(ccc_async.port_bounce_many([mac_address]))
+    error = results[mac_address]
+    assert isinstance(error, DeadlineExceeded)
+    assert error.phase == "task_wait adminStatus=DOWN"
+    time.sleep(2)
+    assert admin_status(mac_address) == "UP"
+    assert not ccc_example.task_waiter._pending
+
+
+def test_bounce_within_deadline_succeeds(controller, monkeypatch, admin_status):
+    monkeypatch.setattr(ccc_example, "BOUNCE_DEADLINE", 30)
+    mac_address = "00:A2:89:AA:DD:03"
+    ccc_example.port_bounce(mac_address)
+    time.sleep(2)  # the bounce returns once its UP is accepted, not applied
+    assert admin_status(mac_address) == "UP"
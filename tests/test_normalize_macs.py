@@ -0,0 +1,39 @@
+import random
+
+import pytest
+
+import ccc_example
+from ccc_example import clean_macs, normalize_mac, normalize_macs
+
+
+def test_notations_dedupe_and_order():
+    macs, invalid = normalize_macs(
+        ["00a2.89aa.aaab", "00:A2:89:AA:AA:AA", "00-a2-89-aa-aa-ab", "nope", "00:11", "00A289AAAAAA"]
+    )
+    assert macs == ["00:A2:89:AA:AA:AB", "00:A2:89:AA:AA:AA"]
+    assert invalid == ["nope", "00:11"]
+
+
+def test_matches_normalize_mac():
+    values = ["0a:0b:0c:0d:0e:0f", "0A0B.0C0D.0E0F", "g0:0b:0c:0d:0e:0f", ""]
+    macs, invalid = normalize_macs(values)
+    assert macs == [normalize_mac(values[0])]
+    assert invalid == values[2:]
+
+
+def test_clean_macs_reports_invalid_values():
+    macs, invalid = clean_macs(["00a2.89aa.aaaa", "bad"])
+    assert macs == ["00:A2:89:AA:AA:AA"]
+    assert list(invalid) == ["bad"]
+    assert "Invalid MAC address" in str(invalid["bad"])
+
+
+def test_numpy_path_matches_python_path(monkeypatch):
+    pytest.importorskip("numpy")
+    rng = random.Random(1)
+    values = [f"{rng.randrange(2 ** 48):012x}" for _ in range(ccc_example.NUMPY_MIN_BATCH)]
+    values = [v[:4] + "." + v[4:8] + "." + v[8:] for v in values] + ["zz", "00:11", "é" * 12] + values[:50]
+    vectorized = normalize_macs(values)
+    assert ccc_example._numpy_loaded
+    monkeypatch.setattr(ccc_example, "_numpy_loaded", False)
+    assert normalize_macs(values) == vectorized
@@ -0,0 +1,95 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import pytest
+
+import ccc_example
+from ccc_example import SwitchDispatcher
+
+# MAC -> (interface name, switch UUID), as get_client_details() returns it
+LOCATIONS = {
+    "A1": ("Gi1/0/1", "switch-a"),
+    "A2": ("Gi1/0/2", "switch-a"),
+    "A3": ("Gi1/0/3", "switch-a"),
+    "A3-PC": ("Gi1/0/3", "switch-a"),
+    "B1": ("Gi1/0/1", "switch-b"),
+    "B2": ("Gi1/0/2", "switch-b"),
+}
+
+
+class FakeBounces:
+    """Bounces that take a while and record what ran side by side"""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.running = {}  # MAC -> switch
+        self.overlaps = []
+
+    def __call__(self, mac_address: str, mode: str) -> None:
+        with self.lock:
+            self.running[mac_address] = LOCATIONS[mac_address][1]
+            self.overlaps.append(dict(self.running))
+        time.sleep(0.05)
+        with self.lock:
+            del self.running[mac_address]
+        if mac_address == "B2":
+            raise ConnectionError("controller went away")
+
+
+@pytest.fixture
+def bounces(monkeypatch):
+    monkeypatch.setattr(ccc_example, "get_client_details", lambda mac_address: LOCATIONS[mac_address])
+    return FakeBounces()
+
+
+def run(bounces: FakeBounces, macs: list[str]) -> dict:
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        dispatcher = SwitchDispatcher(pool, bounces, lookups=2)
+        futures = {mac_address: dispatcher.submit(mac_address) for mac_address in macs}
+        wait(futures.values())
+    return {mac_address: future.exception() for mac_address, future in futures.items()}
+
+
+def test_grouped_input_keeps_both_switches_busy(bounces):
+    results = run(bounces, ["A1", "A2", "A3", "B1", "B2"])
+    assert [mac for mac, error in results.items() if error is not None] == ["B2"]
+    # never two ports of one switch at once, yet switch b didn't wait for a
+    assert all(len(set(running.values())) == len(running) for running in bounces.overlaps)
+    assert any(len(running) == 2 for running in bounces.overlaps[:3])
+
+
+def test_macs_on_one_port_are_sent_together(bounces):
+    run(bounces, ["A1", "A3", "A3-PC"])
+    assert any(set(running) == {"A3", "A3-PC"} for running in bounces.overlaps)
+
+
+def test_cancel_drops_queued_macs(bounces):
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        dispatcher = SwitchDispatcher(pool, bounces, lookups=2)
+        futures = [dispatcher.submit(mac_address) for mac_address in ["A1", "A2", "A3"]]
+        time.sleep(0.02)
+        dispatcher.cancel()
+        wait(futures)
+    assert not futures[0].cancelled()
+    assert futures[1].cancelled() and futures[2].cancelled()
+
+
+def test_async_switch_wait_holds_no_concurrency_slot(bounces, monkeypatch):
+    ccc_async = pytest.importorskip("ccc_async")
+    # port_bounce_many() normalizes its input, so the fakes go by real MACs
+    names = {f"00:00:00:00:00:0{i}": name for i, name in enumerate(["A1", "A2", "A3", "B1", "B2"])}
+
+    async def get_client_details(session, mac_address: str) -> tuple[str, str]:
+        return LOCATIONS[names[mac_address]]
+
+    async def port_bounce(session, mac_address: str, mode: str) -> None:
+        await asyncio.to_thread(bounces, names[mac_address], mode)
+
+    monkeypatch.setattr(ccc_async, "get_client_details", get_client_details)
+    monkeypatch.setattr(ccc_async, "port_bounce", port_bounce)
+    results = asyncio.run(ccc_async.port_bounce_many(list(names), concurrency=2))
+    assert [names[mac] for mac, error in results.items() if error is not None] == ["B2"]
+    assert all(len(set(running.values())) == len(running) for running in bounces.overlaps)
+    assert any(len(running) == 2 for running in bounces.overlaps[:3])
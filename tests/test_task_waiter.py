@@ -0,0 +1,101 @@
+import threading
+import time
+
+import pytest
+
+from ccc_example import PollSchedule, TaskWaiter
+
+FAST = PollSchedule(first=0.01, maximum=0.02, jitter=0)
+
+
+class FakeTasks:
+    """Task lookups answered from a dict, task ID -> response or exception"""
+
+    def __init__(self) -> None:
+        self.responses = {}
+        self.lock = threading.Lock()
+
+    def set(self, task_id: str, response) -> None:
+        with self.lock:
+            self.responses[task_id] = response
+
+    def lookup(self, task_id: str) -> dict:
+        with self.lock:
+            response = self.responses.get(task_id, {"response": {"status": "PENDING"}})
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def status(value: str) -> dict:
+    return {"response": {"status": value}}
+
+
+@pytest.fixture
+def tasks():
+    return FakeTasks()
+
+
+@pytest.fixture
+def waiter(tasks):
+    return TaskWaiter(tasks.lookup, schedule=FAST, workers=2)
+
+
+def test_success_resolves_with_task_details(tasks, waiter):
+    tasks.set("t1", status("SUCCESS"))
+    assert waiter.wait("t1", timeout=2) == status("SUCCESS")
+
+
+def test_failed_task_raises(tasks, waiter):
+    tasks.set("t1", status("FAILURE"))
+    with pytest.raises(Exception, match="Interface update task failed"):
+        waiter.wait("t1", timeout=2)
+
+
+def test_lookup_error_fails_only_that_task(tasks, waiter):
+    tasks.set("bad", ConnectionError("controller went away"))
+    good = waiter.submit("good")
+    with pytest.raises(ConnectionError):
+        waiter.wait("bad", timeout=2)
+    tasks.set("good", status("SUCCESS"))
+    assert good.result(2) == status("SUCCESS")
+
+
+@pytest.mark.parametrize("response", [{}, {"response": None}, {"response": {"status": None}}, []])
+def test_malformed_response_keeps_poller_alive(tasks, waiter, response):
+    tasks.set("bad", response)
+    with pytest.raises((KeyError, TypeError)):
+        waiter.wait("bad", timeout=2)
+    assert waiter._thread.is_alive()
+    tasks.set("next", status("SUCCESS"))
+    assert waiter.wait("next", timeout=2) == status("SUCCESS")
+
+
+def test_wait_timeout_stops_tracking_the_task(tasks, waiter):
+    with pytest.raises(TimeoutError):
+        waiter.wait("slow", timeout=0.05)
+    assert "slow" not in waiter._pending
+    # a late answer for the abandoned task must not disturb the poller
+    tasks.set("slow", status("SUCCESS"))
+    tasks.set("next", status("SUCCESS"))
+    assert waiter.wait("next", timeout=2) == status("SUCCESS")
+
+
+def test_cancel_cancels_the_future(waiter):
+    future = waiter.submit("t1")
+    waiter.cancel("t1")
+    assert future.cancelled()
+    assert "t1" not in waiter._pending
+    waiter.cancel("t1")  # already gone, no error
+
+
+def test_future_cancelled_by_its_waiter_is_skipped(tasks, waiter):
+    # what asyncio.wrap_future does when the awaiting task is cancelled
+    future = waiter.submit("t1")
+    future.cancel()
+    tasks.set("t1", status("SUCCESS"))
+    time.sleep(0.1)
+    assert "t1" not in waiter._pending
+    assert waiter._thread.is_alive()
+    tasks.set("t2", status("SUCCESS"))
+    assert waiter.wait("t2", timeout=2) == status("SUCCESS")
@@ -0,0 +1,29 @@
+import time
+
+import pytest
+
+import ccc_example
+
+TASK_DURATION = 2.5  # interface tasks outlast the 1s wave deadline
+
+
+@pytest.fixture
+def deadline(monkeypatch):
+    monkeypatch.setattr(ccc_example, "BOUNCE_DEADLINE", 1)
+
+
+def test_late_down_is_waited_for_before_the_up(controller, deadline, admin_status):
+    mac_address = "00:A2:89:AA:EE:01"
+    results = ccc_example.port_bounce_waves([mac_address])
+    # the UP task outlasts its own wave too, but it was sent after the DOWN landed
+    assert isinstance(results[mac_address], TimeoutError)
+    time.sleep(3)  # the UP is accepted, not applied
+    assert admin_status(mac_address) == "UP"
+    assert not ccc_example.task_waiter._pending
+
+
+def test_down_pending_past_restore_wait_is_an_error(controller, deadline, admin_status, monkeypatch):
+    monkeypatch.setattr(ccc_example, "RESTORE_WAIT", 0.5)
+    mac_address = "00:A2:89:AA:EE:02"
+    results = ccc_example.port_bounce_waves([mac_address])
+    assert "still pending" in str(results[mac_address])